@@ -5,6 +5,7 @@ Code Editor Component
 Displays auto-generated Python code.
 """
 
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QPlainTextEdit, QLabel
 from PySide6.QtGui import QFont
 
@@ -15,6 +16,8 @@ from bin.core.localisation import tr
 class CodeEditor(QWidget):
     """Code editor component."""
 
+    became_visible = Signal()  # Emitted when the editor is shown or un-collapsed
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._init_ui()
@@ -87,6 +90,20 @@ class CodeEditor(QWidget):
         """Refresh theme styles"""
         self._apply_style()
 
+    def is_on_screen(self) -> bool:
+        """Whether any part of the editor is currently displayed"""
+        return self.isVisible() and not self.visibleRegion().isEmpty()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.became_visible.emit()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # A collapsed splitter pane stays "visible" at zero size
+        if event.oldSize().isEmpty() and not event.size().isEmpty():
+            self.became_visible.emit()
+
     def set_code(self, code: str):
         """Set code content"""
         self.text_edit.setPlainText(code)
@@ -6,11 +6,15 @@ Contains nodes, connections, grid and other elements
 """
 
 import json
+import math
 from typing import Optional, List, Dict, Any
 from shiboken6 import isValid
 
-from PySide6.QtCore import Qt, QRectF, QPointF, QTimer
-from PySide6.QtGui import QPainter, QPen, QColor, QFont, QBrush, QLinearGradient, QGradient, QPainterPath, QDoubleValidator
+from PySide6.QtCore import Qt, QRectF, QPointF, QLine, QTimer, QSignalBlocker, Slot
+from PySide6.QtGui import (
+    QPainter, QPen, QColor, QFont, QFontMetricsF, QBrush, QLinearGradient, QGradient, QPainterPath, QPixmap,
+    QDoubleValidator, QStaticText, QTransform
+)
 from PySide6.QtWidgets import (
     QGraphicsScene, QGraphicsItem, QGraphicsRectItem, QGraphicsEllipseItem,
     QGraphicsPathItem, QGraphicsProxyWidget, QComboBox, QLineEdit, QWidget,
@@ -23,10 +27,86 @@ from bin.core.theme_manager import get_color, get_node_color_pair
 # Import node system
 from nodes import create_node as create_logic_node, get_node_class, REGISTERED_NODES
 
+# Node kinds, resolved once from the display name in create_node
+NODE_KIND_OTHER = 0
+NODE_KIND_LOGIC = 1
+NODE_KIND_CONDITION = 2
+
+# Input slots that feed a single NodeItem line edit (slot -> attribute name)
+_INPUT_SLOT_FIELDS = {
+    "for_start": "_for_start_input",
+    "for_end": "_for_end_input",
+    "for_step": "_for_step_input",
+    "duration": "_duration_input",
+    "left": "_left_input",
+    "right": "_right_input",
+}
+
+# Node name substring -> ui.ini NodeColors key, first match wins
+_NODE_COLOR_KEYS = (
+    ("Logic Control", "logic"),
+    ("逻辑控制", "logic"),
+    ("Condition", "condition"),
+    ("条件判断", "condition"),
+    ("Action Execution", "action"),
+    ("Sensor Input", "sensor"),
+    ("Compute", "compute"),
+)
+
+# Fixed parts of the generated workflow script
+_CODE_HEADER = (
+    "#!/usr/bin/env python3",
+    "# -*- coding: utf-8 -*-",
+    '"""',
+    "Auto-generated workflow code",
+    "Generated by UnitPort - Celebrimbor",
+    '"""',
+    "",
+)
+_CODE_FUNC_HEADER = (
+    "def execute_workflow(robot=None):",
+    "    '''Execute the visual workflow'''",
+)
+_CODE_FOOTER = (
+    "",
+    "if __name__ == '__main__':",
+    "    # Initialize robot (simulation or real)",
+    "    # from models import get_robot_model",
+    "    # robot = get_robot_model('go2')",
+    "    robot = None  # Replace with actual robot instance",
+    "    execute_workflow(robot)",
+)
+
+# Action mapping (UI action name -> robot action), shared by all scenes
+ACTION_MAPPING = {
+    "Lift Right Leg": "lift_right_leg",
+    "Stand": "stand",
+    "Sit": "sit",
+    "Walk": "walk",
+    "Stop": "stop"
+}
+
 
 class ConnectionItem(QGraphicsPathItem):
     """Connection Line Item - Supports auto-update and endpoint editing"""
 
+    MARKER_RADIUS = 4
+
+    # Shared pens and brushes, rebuilt from the theme by refresh_theme()
+    PEN_NORMAL = QPen(QColor("#60a5fa"), 2.5)
+    PEN_HOVER = QPen(QColor("#3b82f6"), 3.5)
+    MARKER_BRUSH = QBrush(QColor("#60a5fa"))
+    MARKER_PEN = QPen(QColor("#ffffff"), 1)
+
+    @classmethod
+    def refresh_theme(cls):
+        """Rebuild the shared pens and brushes from the current theme"""
+        base = QColor(get_color("connection", "#60a5fa"))
+        cls.PEN_NORMAL = QPen(base, 2.5)
+        cls.PEN_HOVER = QPen(QColor(get_color("connection_hover", "#3b82f6")), 3.5)
+        cls.MARKER_BRUSH = QBrush(base)
+        cls.MARKER_PEN = QPen(QColor(get_color("connection_marker_border", "#ffffff")), 1)
+
     def __init__(self, out_port, in_port, parent=None):
         super().__init__(parent)
 
@@ -34,7 +114,8 @@ class ConnectionItem(QGraphicsPathItem):
         self.in_port = in_port
 
         # Set style
-        self.setPen(QPen(QColor(self._base_color()), 2.5))
+        self.setPen(self.PEN_NORMAL)
+        self._hot = False  # True while drawn with PEN_HOVER (hovered or selected)
         self.setZValue(-1)
         self.setData(0, "connection")
 
@@ -42,39 +123,81 @@ class ConnectionItem(QGraphicsPathItem):
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         self.setAcceptHoverEvents(True)
 
-        # Endpoint markers
-        self._start_marker = None
-        self._end_marker = None
-        self._create_markers()
+        # Stationary connections are blitted from a pixmap on pan
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+        # Endpoint markers (for reconnection), painted by paint()
+        self._markers_visible = False
+
+        # Reused move + cubic path buffer and last endpoints for update_path
+        # (Qt drops a cubicTo whose points all equal the start, so seed distinct ones)
+        self._path = QPainterPath()
+        self._path.cubicTo(1, 0, 2, 0, 3, 0)
+        self._last_start = None
+        self._last_end = None
+
+        # Cached hit-test shape, keyed by pen width and marker visibility
+        self._shape = None
+        self._shape_key = None
 
         # Update path
         self.update_path()
 
-    def _create_markers(self):
-        """Create endpoint markers (for reconnection)"""
-        # Start marker
-        self._start_marker = QGraphicsEllipseItem(-4, -4, 8, 8, self)
-        self._start_marker.setBrush(QBrush(QColor(self._base_color())))
-        self._start_marker.setPen(QPen(QColor(self._marker_border_color()), 1))
-        self._start_marker.setZValue(10)
-        self._start_marker.setFlag(QGraphicsItem.ItemIsSelectable, False)
-        self._start_marker.setData(0, "connection_marker")
-        self._start_marker.setData(1, "start")
-        self._start_marker.setData(2, self)  # Associated connection
-        self._start_marker.setAcceptedMouseButtons(Qt.LeftButton)
-        self._start_marker.setVisible(False)
-
-        # End marker
-        self._end_marker = QGraphicsEllipseItem(-4, -4, 8, 8, self)
-        self._end_marker.setBrush(QBrush(QColor(self._base_color())))
-        self._end_marker.setPen(QPen(QColor(self._marker_border_color()), 1))
-        self._end_marker.setZValue(10)
-        self._end_marker.setFlag(QGraphicsItem.ItemIsSelectable, False)
-        self._end_marker.setData(0, "connection_marker")
-        self._end_marker.setData(1, "end")
-        self._end_marker.setData(2, self)  # Associated connection
-        self._end_marker.setAcceptedMouseButtons(Qt.LeftButton)
-        self._end_marker.setVisible(False)
+    def _set_hot(self, hot: bool):
+        """Switch between the normal and highlighted pen, only when the state changes"""
+        if hot != self._hot:
+            self._hot = hot
+            self.setPen(self.PEN_HOVER if hot else self.PEN_NORMAL)
+
+    def _set_markers_visible(self, visible: bool):
+        """Show or hide endpoint markers"""
+        if visible == self._markers_visible:
+            return
+        # Markers are part of shape(), so notify the scene index first
+        self.prepareGeometryChange()
+        self._markers_visible = visible
+        self.update()
+
+    def marker_at(self, pos: QPointF) -> Optional[str]:
+        """Return "start" or "end" if pos hits a visible endpoint marker"""
+        if not self._markers_visible:
+            return None
+        r2 = self.MARKER_RADIUS * self.MARKER_RADIUS
+        for end_type, point in (("start", self._last_start), ("end", self._last_end)):
+            if point is None:
+                continue
+            d = pos - point
+            if d.x() * d.x() + d.y() * d.y() <= r2:
+                return end_type
+        return None
+
+    def boundingRect(self) -> QRectF:
+        m = self.MARKER_RADIUS + 1
+        return super().boundingRect().adjusted(-m, -m, m, m)
+
+    def shape(self) -> QPainterPath:
+        # Hit-testing calls this on every hover move; stroke the curve only when it changed
+        key = (self.pen().widthF(), self._markers_visible)
+        if self._shape is None or self._shape_key != key:
+            path = super().shape()
+            if self._markers_visible:
+                r = self.MARKER_RADIUS
+                for point in (self._last_start, self._last_end):
+                    if point is not None:
+                        path.addEllipse(point, r, r)
+            self._shape = path
+            self._shape_key = key
+        return self._shape
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+        if not self._markers_visible or self._last_start is None:
+            return
+        r = self.MARKER_RADIUS
+        painter.setPen(self.MARKER_PEN)
+        painter.setBrush(self.MARKER_BRUSH)
+        painter.drawEllipse(self._last_start, r, r)
+        painter.drawEllipse(self._last_end, r, r)
 
     def update_path(self):
         """Update connection path"""
@@ -87,107 +210,214 @@ class ConnectionItem(QGraphicsPathItem):
 
         # Get port center positions
         try:
-            start = self.out_port.mapToScene(self.out_port.boundingRect().center())
-            end = self.in_port.mapToScene(self.in_port.boundingRect().center())
+            start = self.out_port.scene_center()
+            end = self.in_port.scene_center()
         except RuntimeError:
             return
 
-        # Create bezier curve path
-        path = QPainterPath()
-        path.moveTo(start)
+        # Skip rebuild when neither endpoint moved
+        if start == self._last_start and end == self._last_end:
+            return
+        self._last_start = start
+        self._last_end = end
 
-        dx = end.x() - start.x()
-        path.cubicTo(
-            start.x() + dx * 0.5, start.y(),
-            end.x() - dx * 0.5, end.y(),
-            end.x(), end.y()
-        )
+        # Move the four bezier points in place (start, two controls, end)
+        sx, sy = start.x(), start.y()
+        ex, ey = end.x(), end.y()
+        dx_half = (ex - sx) * 0.5
 
-        self.setPath(path)
+        path = self._path
+        path.setElementPositionAt(0, sx, sy)
+        path.setElementPositionAt(1, sx + dx_half, sy)
+        path.setElementPositionAt(2, ex - dx_half, ey)
+        path.setElementPositionAt(3, ex, ey)
 
-        # Update endpoint marker positions
-        if self._start_marker:
-            self._start_marker.setPos(start)
-        if self._end_marker:
-            self._end_marker.setPos(end)
+        self.setPath(path)
+        self._shape = None
 
     def hoverEnterEvent(self, event):
         """Mouse hover - show endpoint markers"""
-        self.setPen(QPen(QColor(self._hover_color()), 3.5))
-        if self._start_marker:
-            self._start_marker.setVisible(True)
-        if self._end_marker:
-            self._end_marker.setVisible(True)
+        self._set_hot(True)
+        self._set_markers_visible(True)
         super().hoverEnterEvent(event)
 
     def hoverLeaveEvent(self, event):
         """Mouse leave - hide endpoint markers"""
         if not self.isSelected():
-            self.setPen(QPen(QColor(self._base_color()), 2.5))
-        if self._start_marker:
-            self._start_marker.setVisible(False)
-        if self._end_marker:
-            self._end_marker.setVisible(False)
+            self._set_hot(False)
+        self._set_markers_visible(False)
         super().hoverLeaveEvent(event)
 
     def itemChange(self, change, value):
         """Item change event"""
         if change == QGraphicsItem.ItemSelectedHasChanged:
             if value:  # Selected
-                self.setPen(QPen(QColor(self._hover_color()), 3.5))
-                if self._start_marker:
-                    self._start_marker.setVisible(True)
-                if self._end_marker:
-                    self._end_marker.setVisible(True)
+                self._set_hot(True)
+                self._set_markers_visible(True)
             else:  # Not selected
-                self.setPen(QPen(QColor(self._base_color()), 2.5))
-                if self._start_marker:
-                    self._start_marker.setVisible(False)
-                if self._end_marker:
-                    self._end_marker.setVisible(False)
+                self._set_hot(False)
+                self._set_markers_visible(False)
 
         return super().itemChange(change, value)
 
-    def _base_color(self) -> str:
-        return get_color("connection", "#60a5fa")
+    def refresh_style(self):
+        """Refresh connection colors"""
+        # The shared pens were rebuilt, so re-apply even if the state is unchanged
+        self._hot = self.isSelected()
+        self.setPen(self.PEN_HOVER if self._hot else self.PEN_NORMAL)
+        self.update()
 
-    def _hover_color(self) -> str:
-        return get_color("connection_hover", "#3b82f6")
 
-    def _marker_border_color(self) -> str:
-        return get_color("connection_marker_border", "#ffffff")
+class NodeItem(QGraphicsRectItem):
+    """Node rectangle item - keeps attached connections in sync with its position"""
+
+    _kind = NODE_KIND_OTHER
+
+    # Editor widgets set by create_node; None when the node type has no such field
+    _combo = None
+    _condition_input = None
+    _condition_label = None
+    _loop_type_combo = None
+    _for_start_input = None
+    _for_end_input = None
+    _for_step_input = None
+    _elif_inputs = None
+    _elif_by_slot = None
+    _elif_output_ports = None
+    _left_input = None
+    _right_input = None
+    _output_box = None
+    _duration_input = None
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # Port items of this node, filled by create_node
+        self._ports: List[QGraphicsEllipseItem] = []
 
-    def refresh_style(self):
-        """Refresh connection colors"""
-        if self.isSelected():
-            self.setPen(QPen(QColor(self._hover_color()), 3.5))
-        else:
-            self.setPen(QPen(QColor(self._base_color()), 2.5))
-        if self._start_marker:
-            self._start_marker.setBrush(QBrush(QColor(self._base_color())))
-            self._start_marker.setPen(QPen(QColor(self._marker_border_color()), 1))
-        if self._end_marker:
-            self._end_marker.setBrush(QBrush(QColor(self._base_color())))
-            self._end_marker.setPen(QPen(QColor(self._marker_border_color()), 1))
+    def itemChange(self, change, value):
+        """Item change event"""
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            # Ports hear about the move only after this returns, so drop their
+            # cached centers before re-routing the connections
+            for port in self._ports:
+                port._scene_center = None
+            scene = self.scene()
+            if scene is not None:
+                scene._mark_connections_dirty(self)
+        return super().itemChange(change, value)
+
+    def update_connections(self):
+        """Update paths of all connections attached to this node's ports"""
+        for port in self._ports:
+            for conn in port._connections:
+                if conn and isValid(conn) and conn.scene() is not None:
+                    conn.update_path()
+
+
+class PortItem(QGraphicsEllipseItem):
+    """Node port - keeps the scene's port lookup grid in sync with its position"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._connections = set()  # Attached ConnectionItems
+        self._grid_cell = None  # Cell in GraphScene._port_grid, None if not indexed
+        self._scene_center = None  # Cached scene position of the port center
+        self._label = ""  # "<node name>.<slot>", shown in inputs this port feeds
+        self.setFlag(QGraphicsItem.ItemSendsScenePositionChanges, True)
+
+    def scene_center(self) -> QPointF:
+        """Port center in scene coordinates (the ellipse is centered on pos())"""
+        if self._scene_center is None:
+            self._scene_center = self.scenePos()
+        return self._scene_center
+
+    def itemChange(self, change, value):
+        """Item change event"""
+        if change == QGraphicsItem.ItemScenePositionHasChanged:
+            self._scene_center = QPointF(value)
+            scene = self.scene()
+            if scene is not None:
+                scene._index_port(self)
+        elif change == QGraphicsItem.ItemSceneChange:
+            scene = self.scene()
+            if scene is not None:
+                scene._unindex_port(self)
+        return super().itemChange(change, value)
+
+
+class NodeLabelItem(QGraphicsItem):
+    """Node title item - text laid out once into a QStaticText, not on every paint"""
+
+    # Matches the document margin of the QGraphicsTextItem it replaces
+    MARGIN = 4
+
+    def __init__(self, text: str, font: QFont, color: QColor, parent=None):
+        super().__init__(parent)
+        self._font = QFont(font)
+        self._pen = QPen(color)
+        self._static = QStaticText(text)
+        self._static.setTextFormat(Qt.PlainText)
+        self._static.setPerformanceHint(QStaticText.AggressiveCaching)
+        self._static.prepare(QTransform(), self._font)
+        size = self._static.size()
+        self._rect = QRectF(0, 0, size.width(), size.height())
+
+    def set_color(self, color: QColor):
+        """Set text color"""
+        self._pen = QPen(color)
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        painter.setFont(self._font)
+        painter.setPen(self._pen)
+        painter.drawStaticText(0, 0, self._static)
+
+
+def _layout_row(row_widget: QWidget, leading=(), trailing=()) -> QHBoxLayout:
+    """Lay out a node row: leading widgets, a stretch, then trailing widgets"""
+    row = QHBoxLayout(row_widget)
+    row.setContentsMargins(0, 0, 0, 0)
+    row.setSpacing(4)
+    for widget in leading:
+        row.addWidget(widget)
+    row.addStretch(1)
+    for widget in trailing:
+        row.addWidget(widget)
+    return row
+
+
+def _proxy_row_y(proxy: QGraphicsProxyWidget, widget: Optional[QWidget]) -> Optional[float]:
+    """Node-local y of a widget's center inside a node proxy, None if hidden
+
+    Hidden rows keep stale geometry; their ports are hidden as well.
+    """
+    if not widget or not widget.isVisible():
+        return None
+    geo = widget.geometry()
+    return proxy.pos().y() + geo.y() + geo.height() / 2
+
+
+def _make_row(leading=(), trailing=()) -> QWidget:
+    """Create a node row widget; rows never fill their background"""
+    row_widget = QWidget()
+    row_widget.setObjectName("nodeRow")
+    _layout_row(row_widget, leading, trailing)
+    return row_widget
 
 
 class PortInputRow(QWidget):
     """Input row widget that keeps a port aligned to its geometry."""
 
-    def __init__(self, placeholder: str, style: str, trailing: Optional[QWidget] = None, parent=None):
+    def __init__(self, placeholder: str, trailing: Optional[QWidget] = None, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("background: transparent;")
+        self.setObjectName("nodeRow")
         self.line_edit = QLineEdit()
+        self.line_edit.setObjectName("nodeInput")
         self.line_edit.setPlaceholderText(placeholder)
-        self.line_edit.setStyleSheet(style)
-
-        row = QHBoxLayout(self)
-        row.setContentsMargins(0, 0, 0, 0)
-        row.setSpacing(4)
-        row.addWidget(self.line_edit)
-        row.addStretch(1)
-        if trailing is not None:
-            row.addWidget(trailing)
+        _layout_row(self, (self.line_edit,), (trailing,) if trailing is not None else ())
 
     def center_y(self, proxy: QGraphicsProxyWidget) -> float:
         geo = self.geometry()
@@ -197,6 +427,8 @@ class PortInputRow(QWidget):
 class GraphScene(QGraphicsScene):
     """Graph Editor Scene"""
 
+    PORT_CELL = 32  # Port lookup grid cell size (scene units)
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -204,12 +436,14 @@ class GraphScene(QGraphicsScene):
         self.setSceneRect(-2500, -2500, 5000, 5000)
         self.grid_small = 20
         self.grid_big = self.grid_small * 5
+        self._grid_tile_key = None
 
         # Color configuration
         self._apply_theme()
 
         # Nodes and connections
         self._node_seq = 0
+        self._port_grid: Dict[tuple, List[PortItem]] = {}  # (cx, cy) cell -> ports
         self._temp_connection = None
         self._temp_start_port = None
 
@@ -219,14 +453,11 @@ class GraphScene(QGraphicsScene):
         self._reconnect_end = None  # "start" or "end"
         self._reconnect_original_port = None  # Save original port for cancel
 
-        # Action mapping (UI action name -> robot action)
-        self._action_mapping = {
-            "Lift Right Leg": "lift_right_leg",
-            "Stand": "stand",
-            "Sit": "sit",
-            "Walk": "walk",
-            "Stop": "stop"
-        }
+        # All live nodes in the scene (node_id -> node item), in creation order
+        self._nodes_by_id: Dict[int, QGraphicsRectItem] = {}
+
+        # All live connections in the scene, in creation order (values unused)
+        self._connections: Dict[ConnectionItem, None] = {}
 
         # Node display name -> logic node type mapping
         self._node_type_mapping = {
@@ -246,16 +477,30 @@ class GraphScene(QGraphicsScene):
         self._simulation_thread = None
         self._robot_type = "go2"
 
-        # Timer - for updating connections
-        self._update_timer = QTimer()
-        self._update_timer.timeout.connect(self._update_all_connections)
-        self._update_timer.start(16)  # 60fps
+        # Connections of moved nodes, re-routed once on the next event loop pass
+        self._dirty_connections = set()
+        self._path_timer = QTimer()
+        self._path_timer.setSingleShot(True)
+        self._path_timer.timeout.connect(self._flush_connection_paths)
+
+        # Debounce timer - bursts of edits coalesce into one code regeneration
+        self._regen_timer = QTimer()
+        self._regen_timer.setSingleShot(True)
+        self._regen_timer.timeout.connect(self._do_regenerate_code)
+        self._regen_pending = False  # Rebuild deferred while the code editor is hidden
 
         log_debug("GraphScene initialized")
 
     def set_code_editor(self, editor):
         """Set code editor reference"""
         self._code_editor = editor
+        editor.became_visible.connect(self._on_code_editor_shown)
+
+    @Slot()
+    def _on_code_editor_shown(self):
+        """Run the rebuild that was deferred while the editor was hidden"""
+        if self._regen_pending:
+            self.flush_code()
 
     def set_robot_type(self, robot_type: str):
         """Set robot type"""
@@ -267,7 +512,17 @@ class GraphScene(QGraphicsScene):
         self.color_bg = QColor(get_color("graph_bg", get_color("bg", "#1e1e1e")))
         self.color_grid_small = QColor(get_color("graph_grid_small", "#323337"))
         self.color_grid_big = QColor(get_color("graph_grid_big", "#3c3e43"))
+        self._pen_grid_small = QPen(self.color_grid_small, 1)
+        self._pen_grid_big = QPen(self.color_grid_big, 2)
+        self._rebuild_grid_tile()
         self._node_title_color = QColor(get_color("node_title", "#ffffff"))
+        self._temp_pen = QPen(QColor(get_color("connection", "#60a5fa")), 3)
+        self._reconnect_pen = QPen(QColor(get_color("connection_temp", "#f59e0b")), 3)
+        # Shared by every port and node border until the next theme change
+        self._port_brush = QBrush(QColor(get_color("port_bg", "#1f2937")))
+        self._port_pen = QPen(QColor(get_color("port_border", get_color("connection", "#60a5fa"))), 2)
+        self._node_pen = QPen(QColor(get_color("node_border", get_color("border", "#78828c"))), 2)
+        ConnectionItem.refresh_theme()
 
         input_bg = get_color("input_bg", get_color("cmd_bg", "#0f1115"))
         input_text = get_color("input_text", get_color("text_primary", "#e5e7eb"))
@@ -279,8 +534,13 @@ class GraphScene(QGraphicsScene):
         button_text = get_color("button_text", get_color("text_primary", "#e5e7eb"))
         button_border = get_color("button_border", input_border)
 
-        self._combo_style = f"""
-            QComboBox {{
+        tag_bg = get_color("tag_bg", get_color("hover_bg", "#3d3d3d"))
+        tag_text = get_color("tag_text", get_color("text_primary", "#ffffff"))
+
+        # Shared node widget stylesheet, applied once per node proxy widget.
+        # Node widgets opt in through their object names.
+        self._node_style = f"""
+            QComboBox#nodeCombo {{
                 background: {input_bg};
                 color: {input_text};
                 border: 1px solid {input_border};
@@ -288,16 +548,12 @@ class GraphScene(QGraphicsScene):
                 padding: 2px 4px;
                 font-size: 11px;
             }}
-        """
-        self._combo_view_style = f"""
-            QComboBox QAbstractItemView {{
+            QComboBox#nodeCombo QAbstractItemView {{
                 background: {popup_bg};
                 color: {input_text};
                 selection-background-color: {popup_sel};
             }}
-        """
-        self._input_style = f"""
-            QLineEdit {{
+            QLineEdit#nodeInput {{
                 background: {input_bg};
                 color: {input_text};
                 border: 1px solid {input_border};
@@ -305,9 +561,7 @@ class GraphScene(QGraphicsScene):
                 padding: 2px 4px;
                 font-size: 11px;
             }}
-        """
-        self._button_style = f"""
-            QPushButton {{
+            QPushButton#nodeButton, QPushButton#nodeRemoveButton {{
                 background: {button_bg};
                 color: {button_text};
                 border: 1px solid {button_border};
@@ -315,13 +569,12 @@ class GraphScene(QGraphicsScene):
                 padding: 2px 4px;
                 font-size: 10px;
             }}
-            QPushButton:hover {{
+            QPushButton#nodeRemoveButton {{
+                padding: 0px;
+            }}
+            QPushButton#nodeButton:hover, QPushButton#nodeRemoveButton:hover {{
                 background: {hover_bg};
             }}
-        """
-        tag_bg = get_color("tag_bg", get_color("hover_bg", "#3d3d3d"))
-        tag_text = get_color("tag_text", get_color("text_primary", "#ffffff"))
-        self._tag_style = f"""
             QLabel#nodeTag {{
                 color: {tag_text};
                 background: {tag_bg};
@@ -337,66 +590,63 @@ class GraphScene(QGraphicsScene):
         fallback_start = grad[0] if grad and len(grad) == 2 else card_bg
         fallback_end = grad[1] if grad and len(grad) == 2 else card_bg
 
-        if "Logic Control" in name or "閫昏緫鎺у埗" in name:
-            return get_node_color_pair("logic", fallback_start, fallback_end)
-        if "Condition" in name or "鏉′欢鍒ゆ柇" in name:
-            return get_node_color_pair("condition", fallback_start, fallback_end)
-        if "Action Execution" in name:
-            return get_node_color_pair("action", fallback_start, fallback_end)
-        if "Sensor Input" in name:
-            return get_node_color_pair("sensor", fallback_start, fallback_end)
-        if "Compute" in name:
-            return get_node_color_pair("compute", fallback_start, fallback_end)
+        for token, color_key in _NODE_COLOR_KEYS:
+            if token in name:
+                return get_node_color_pair(color_key, fallback_start, fallback_end)
 
         if grad and len(grad) == 2:
             return tuple(grad)
         return (card_bg, card_bg)
 
+    @staticmethod
+    def _grid_lines(rect: QRectF, step: int) -> List[QLine]:
+        """Build vertical and horizontal grid lines covering rect, snapped to whole pixels"""
+        r_left, r_right = math.floor(rect.left()), math.ceil(rect.right())
+        r_top, r_bottom = math.floor(rect.top()), math.ceil(rect.bottom())
+        left = r_left // step * step
+        top = r_top // step * step
+
+        # Grid coordinates are integers, so QLine keeps Qt on its integer line path
+        lines = [QLine(x, r_top, x, r_bottom) for x in range(left, r_right, step)]
+        lines += [QLine(r_left, y, r_right, y) for y in range(top, r_bottom, step)]
+        return lines
+
+    def _rebuild_grid_tile(self):
+        """Render one big-grid cell into a pixmap and use it as the tiled background brush"""
+        # Theme refreshes usually keep the grid colors, so reuse the current tile then
+        key = (self.grid_small, self.grid_big,
+               self.color_bg.rgba(), self.color_grid_small.rgba(), self.color_grid_big.rgba())
+        if key == self._grid_tile_key:
+            return
+        self._grid_tile_key = key
+
+        size = self.grid_big
+        tile = QPixmap(size, size)
+        tile.fill(self.color_bg)
+
+        painter = QPainter(tile)
+        painter.setPen(self._pen_grid_small)
+        painter.drawLines(self._grid_lines(QRectF(0, 0, size, size), self.grid_small))
+
+        # The 2px big-grid line straddles the cell edge, so draw both halves
+        painter.setPen(self._pen_grid_big)
+        painter.drawLines([
+            QLine(0, 0, 0, size), QLine(size, 0, size, size),
+            QLine(0, 0, size, 0), QLine(0, size, size, size),
+        ])
+        painter.end()
+
+        self.setBackgroundBrush(QBrush(tile))
+
     def drawBackground(self, painter: QPainter, rect: QRectF):
-        """Draw grid background"""
-        painter.fillRect(rect, self.color_bg)
-
-        # Draw small grid
-        left = int(rect.left()) - (int(rect.left()) % self.grid_small)
-        top = int(rect.top()) - (int(rect.top()) % self.grid_small)
-
-        lines = []
-
-        # Vertical lines
-        x = left
-        while x < rect.right():
-            lines.append((x, rect.top(), x, rect.bottom()))
-            x += self.grid_small
-
-        # Horizontal lines
-        y = top
-        while y < rect.bottom():
-            lines.append((rect.left(), y, rect.right(), y))
-            y += self.grid_small
-
-        # Draw small grid
-        painter.setPen(QPen(self.color_grid_small, 1))
-        for x1, y1, x2, y2 in lines:
-            painter.drawLine(int(x1), int(y1), int(x2), int(y2))
-
-        # Draw big grid
-        left = int(rect.left()) - (int(rect.left()) % self.grid_big)
-        top = int(rect.top()) - (int(rect.top()) % self.grid_big)
-
-        big_lines = []
-        x = left
-        while x < rect.right():
-            big_lines.append((x, rect.top(), x, rect.bottom()))
-            x += self.grid_big
-
-        y = top
-        while y < rect.bottom():
-            big_lines.append((rect.left(), y, rect.right(), y))
-            y += self.grid_big
-
-        painter.setPen(QPen(self.color_grid_big, 2))
-        for x1, y1, x2, y2 in big_lines:
-            painter.drawLine(int(x1), int(y1), int(x2), int(y2))
+        """Draw grid background from the cached tile brush"""
+        # Only the scene rect carries the grid; anything beyond it is plain background
+        grid_rect = rect.intersected(self.sceneRect())
+        if grid_rect != rect:
+            painter.fillRect(rect, self.color_bg)
+        if grid_rect.isEmpty():
+            return
+        painter.fillRect(grid_rect, self.backgroundBrush())
 
     def mousePressEvent(self, event):
         """Mouse press event"""
@@ -404,11 +654,11 @@ class GraphScene(QGraphicsScene):
         item = self.itemAt(pos, self.views()[0].transform() if self.views() else None)
 
         # Check if clicked on connection marker (endpoint)
-        if item and item.data(0) == "connection_marker":
-            connection = item.data(2)
-            end_type = item.data(1)
-            self._start_reconnection(connection, end_type, pos)
-            return
+        if isinstance(item, ConnectionItem):
+            end_type = item.marker_at(pos)
+            if end_type:
+                self._start_reconnection(item, end_type, pos)
+                return
 
         # Check if clicked on port
         if self._is_port(item):
@@ -485,6 +735,7 @@ class GraphScene(QGraphicsScene):
                 # Delete corresponding logic node
                 if node_id in self._logic_nodes:
                     del self._logic_nodes[node_id]
+                self._nodes_by_id.pop(node_id, None)
 
                 # Delete the node itself
                 self.removeItem(item)
@@ -496,7 +747,9 @@ class GraphScene(QGraphicsScene):
                 # Remove connection reference from ports
                 if isinstance(item, ConnectionItem):
                     self._detach_connection(item)
-                self.removeItem(item)
+                    self._remove_connection(item)
+                else:
+                    self.removeItem(item)
                 deleted_connections.append("Connection")
 
         if deleted_nodes:
@@ -509,35 +762,31 @@ class GraphScene(QGraphicsScene):
 
     def _delete_node_connections(self, node_item):
         """Delete all connections related to a node"""
-        # Find all ports
-        ports = []
-        for child in node_item.childItems():
-            if self._is_port(child):
-                ports.append(child)
-
         # Delete connections for each port
-        for port in ports:
-            connections = port.data(2) or []
-            for conn in list(connections):  # Use list() to create copy to avoid modification during iteration
+        for port in node_item._ports:
+            for conn in list(port._connections):  # Copy, _remove_connection discards from the set
                 if conn and isValid(conn) and conn.scene() is not None:
-                    self.removeItem(conn)
+                    self._remove_connection(conn)
+
+    def _remove_connection(self, conn):
+        """Remove a connection item from the scene and the connection set"""
+        self._connections.pop(conn, None)
+        for port in (conn.out_port, conn.in_port):
+            if port is not None and isValid(port):
+                port._connections.discard(conn)
+        if conn.scene() is self:
+            self.removeItem(conn)
 
     def _detach_connection(self, connection):
         """Remove connection reference from ports"""
         if isinstance(connection, ConnectionItem):
             # Remove from output port
             if connection.out_port and isValid(connection.out_port):
-                conns = connection.out_port.data(2) or []
-                if connection in conns:
-                    conns.remove(connection)
-                    connection.out_port.setData(2, conns)
+                connection.out_port._connections.discard(connection)
 
             # Remove from input port
             if connection.in_port and isValid(connection.in_port):
-                conns = connection.in_port.data(2) or []
-                if connection in conns:
-                    conns.remove(connection)
-                    connection.in_port.setData(2, conns)
+                connection.in_port._connections.discard(connection)
                 self._clear_input_for_port(connection.in_port)
 
     def _start_reconnection(self, connection, end_type, pos):
@@ -568,8 +817,7 @@ class GraphScene(QGraphicsScene):
         path.lineTo(pos)
 
         self._temp_connection = QGraphicsPathItem(path)
-        temp_color = get_color("connection_temp", "#f59e0b")
-        self._temp_connection.setPen(QPen(QColor(temp_color), 3))
+        self._temp_connection.setPen(self._reconnect_pen)
         self.addItem(self._temp_connection)
 
         log_debug(f"Starting reconnection: {end_type} end")
@@ -608,10 +856,7 @@ class GraphScene(QGraphicsScene):
 
         # Remove from original port's connection list if different
         if self._reconnect_original_port and self._reconnect_original_port != target_port:
-            conns = self._reconnect_original_port.data(2) or []
-            if self._reconnect_connection in conns:
-                conns.remove(self._reconnect_connection)
-                self._reconnect_original_port.setData(2, conns)
+            self._reconnect_original_port._connections.discard(self._reconnect_connection)
             # Clear input widget if it was an input port
             if self._reconnect_original_port.data(1) == "in":
                 self._clear_input_for_port(self._reconnect_original_port)
@@ -674,8 +919,7 @@ class GraphScene(QGraphicsScene):
         path.lineTo(pos)
 
         self._temp_connection = QGraphicsPathItem(path)
-        temp_color = get_color("connection", "#60a5fa")
-        self._temp_connection.setPen(QPen(QColor(temp_color), 3))
+        self._temp_connection.setPen(self._temp_pen)
         self.addItem(self._temp_connection)
 
     def _update_temp_connection(self, pos):
@@ -734,6 +978,7 @@ class GraphScene(QGraphicsScene):
         """Create connection - using ConnectionItem"""
         conn = ConnectionItem(out_port, in_port)
         self.addItem(conn)
+        self._connections[conn] = None
 
         # Attach to ports
         self._attach_connection_safe(out_port, conn)
@@ -742,37 +987,47 @@ class GraphScene(QGraphicsScene):
         log_debug(f"Connection created: {out_port.data(3)} -> {in_port.data(3)}")
         self._apply_connection_to_input(in_port, out_port)
 
+    def _mark_connections_dirty(self, node_item):
+        """Queue the connections of a moved node for re-routing"""
+        for port in node_item._ports:
+            self._dirty_connections.update(port._connections)
+        if self._dirty_connections and not self._path_timer.isActive():
+            self._path_timer.start(0)
+
+    def _flush_connection_paths(self):
+        """Re-route every queued connection once"""
+        dirty, self._dirty_connections = self._dirty_connections, set()
+        for conn in dirty:
+            if isValid(conn) and conn.scene() is self:
+                conn.update_path()
+
     def _update_all_connections(self):
         """Update all connection paths"""
-        for item in self.items():
-            if isinstance(item, ConnectionItem):
-                item.update_path()
+        for conn in self._connections:
+            conn.update_path()
 
     def refresh_style(self):
         """Refresh theme styles across the scene"""
         self._apply_theme()
-        port_bg = get_color("port_bg", "#1f2937")
-        port_border = get_color("port_border", get_color("connection", "#60a5fa"))
-        node_border = get_color("node_border", get_color("border", "#78828c"))
 
         for item in self.items():
             if isinstance(item, ConnectionItem):
                 item.refresh_style()
                 continue
 
-            if item.data(0) == "port":
-                item.setBrush(QBrush(QColor(port_bg)))
-                item.setPen(QPen(QColor(port_border), 2))
+            if isinstance(item, PortItem):
+                item.setBrush(self._port_brush)
+                item.setPen(self._port_pen)
                 continue
 
             if item.data(10) == "node":
                 if isinstance(item, QGraphicsRectItem):
-                    item.setPen(QPen(QColor(node_border), 2))
+                    item.setPen(self._node_pen)
                 for child in item.childItems():
                     if isinstance(child, QGraphicsProxyWidget):
                         self._apply_proxy_widget_theme(child)
-                    elif hasattr(child, "setDefaultTextColor"):
-                        child.setDefaultTextColor(self._node_title_color)
+                    elif isinstance(child, NodeLabelItem):
+                        child.set_color(self._node_title_color)
 
         self.update()
 
@@ -780,24 +1035,21 @@ class GraphScene(QGraphicsScene):
         widget = proxy.widget()
         if not widget:
             return
-        if isinstance(widget, QComboBox):
-            widget.setStyleSheet(self._combo_style + self._combo_view_style)
-        if isinstance(widget, QLineEdit):
-            widget.setStyleSheet(self._input_style)
-        if isinstance(widget, QPushButton):
-            widget.setStyleSheet(self._button_style)
-        if isinstance(widget, QLabel) and widget.objectName() == "nodeTag":
-            widget.setStyleSheet(self._tag_style)
-
-        for combo in widget.findChildren(QComboBox):
-            combo.setStyleSheet(self._combo_style + self._combo_view_style)
-        for line_edit in widget.findChildren(QLineEdit):
-            line_edit.setStyleSheet(self._input_style)
-        for btn in widget.findChildren(QPushButton):
-            btn.setStyleSheet(self._button_style)
-        for lbl in widget.findChildren(QLabel):
-            if lbl.objectName() == "nodeTag":
-                lbl.setStyleSheet(self._tag_style)
+        # Child widgets pick up the shared node stylesheet through their object names
+        widget.setStyleSheet(self._node_style)
+
+    def _fit_node_to_proxy(self, rect, proxy):
+        """Resize a node's height to fit the content of its proxy widget"""
+        container = proxy.widget()
+        layout = container.layout()
+        if layout:
+            layout.activate()
+        container.adjustSize()
+        size_hint = container.sizeHint()
+        proxy.setMinimumSize(size_hint)
+        target_h = int(proxy.pos().y() + size_hint.height() + 10)
+        if target_h != rect.rect().height():
+            rect.setRect(0, 0, rect.rect().width(), target_h)
 
     def create_node(self, name: str, scene_pos: QPointF,
                     features: List[str] = None, grad: tuple = None):
@@ -810,16 +1062,25 @@ class GraphScene(QGraphicsScene):
             features: Feature list
             grad: Gradient colors (color1, color2)
         """
-        # Adjust width based on node type
+        # Resolve node kind once; later branches compare the integer
         if "Logic Control" in name or "逻辑控制" in name:
-            w, h = 240, 200
+            kind = NODE_KIND_LOGIC
         elif "Condition" in name or "条件判断" in name:
+            kind = NODE_KIND_CONDITION
+        else:
+            kind = NODE_KIND_OTHER
+
+        # Adjust width based on node type
+        if kind == NODE_KIND_LOGIC:
+            w, h = 240, 200
+        elif kind == NODE_KIND_CONDITION:
             w, h = 260, 170
         else:
             w, h = 180, 110
 
         # Create node rectangle
-        rect = QGraphicsRectItem(0, 0, w, h)
+        rect = NodeItem(0, 0, w, h)
+        rect._kind = kind
 
         # Gradient background
         resolved_grad = self._resolve_node_gradient(name, grad)
@@ -832,130 +1093,79 @@ class GraphScene(QGraphicsScene):
         else:
             rect.setBrush(QBrush(QColor(45, 50, 60)))
 
-        rect.setPen(QPen(QColor(get_color("node_border", get_color("border", "#78828c"))), 2))
+        rect.setPen(self._node_pen)
         rect.setFlag(QGraphicsItem.ItemIsMovable, True)
         rect.setFlag(QGraphicsItem.ItemIsSelectable, True)
         rect.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)  # Important: send geometry change signals
         rect.setPos(scene_pos - QPointF(w / 2, h / 2))
         self.addItem(rect)
+        rect.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
         # Title - use fixed width to ensure display
         f = QFont()
         f.setPointSize(9)
         f.setBold(True)
-        label = self.addText(str(name), f)
-        label.setDefaultTextColor(self._node_title_color)
-        label.setParentItem(rect)
-        label.setZValue(2)
-        label.setPos(8, 6)
 
-        # If title is too long, crop display
-        label_width = label.boundingRect().width()
-        if label_width > w - 16:
+        # If title is too long, crop display (measured without laying out an item)
+        title = str(name)
+        if QFontMetricsF(f).horizontalAdvance(title) > w - 16 - 2 * NodeLabelItem.MARGIN:
             # Adjust font size
             f.setPointSize(8)
-            label.setFont(f)
+
+        label = NodeLabelItem(title, f, self._node_title_color, rect)
+        label.setZValue(2)
+        label.setPos(8 + NodeLabelItem.MARGIN, 6 + NodeLabelItem.MARGIN)
 
         # Create port function
         port_r = 6
 
         def _mk_port(x, y, io, slot, radius=port_r):
-            p = QGraphicsEllipseItem(-radius, -radius, radius * 2, radius * 2, rect)
+            p = PortItem(-radius, -radius, radius * 2, radius * 2, rect)
             p.setPos(x, y)
-            port_bg = get_color("port_bg", "#1f2937")
-            port_border = get_color("port_border", get_color("connection", "#60a5fa"))
-            p.setBrush(QBrush(QColor(port_bg)))
-            p.setPen(QPen(QColor(port_border), 2))
+            p.setBrush(self._port_brush)
+            p.setPen(self._port_pen)
             p.setData(0, "port")
             p.setData(1, io)
-            p.setData(2, [])
             p.setData(3, slot)
+            p._label = f"{name}.{slot}"
             p.setZValue(3)
             p.setAcceptedMouseButtons(Qt.LeftButton)
             p.setAcceptHoverEvents(True)
+            rect._ports.append(p)
             return p
 
         # Create different UI and ports based on node type
         combo = None
 
-        if "Logic Control" in name or "逻辑控制" in name:
+        if kind == NODE_KIND_LOGIC:
             features = features or ["If", "While Loop"]
             combo = QComboBox()
             combo.addItems(features)
             combo.setMinimumWidth(int(w * 0.8))
             combo.setMaximumWidth(int(w - 16))
-            combo.setStyleSheet(self._combo_style + self._combo_view_style)
+            combo.setObjectName("nodeCombo")
 
             condition_input = QLineEdit()
             condition_input.setPlaceholderText("condition / connect")
-            condition_input.setStyleSheet(self._input_style)
+            condition_input.setObjectName("nodeInput")
 
             add_elif_btn = QPushButton("+elif")
             add_elif_btn.setFixedWidth(48)
-            add_elif_btn.setStyleSheet(self._button_style)
-
-            loop_type_combo = QComboBox()
-            loop_type_combo.addItems(["While", "For"])
-            loop_type_combo.setStyleSheet(self._combo_style + self._combo_view_style)
+            add_elif_btn.setObjectName("nodeButton")
 
             def _make_tag(text: str) -> QLabel:
                 lbl = QLabel(text)
                 lbl.setObjectName("nodeTag")
-                lbl.setStyleSheet(self._tag_style)
                 return lbl
 
-            loop_label = _make_tag("Loop")
             condition_label = _make_tag("Condition")
             out_true_label = _make_tag("True")
             out_false_label = _make_tag("False")
-            loop_body_label = _make_tag("Body")
-            loop_end_label = _make_tag("End")
-            for_end_label = _make_tag("End")
-
-            for_start_input = QLineEdit()
-            for_start_input.setPlaceholderText("start")
-            for_start_input.setStyleSheet("""
-                QLineEdit {
-                    background: #0f1115;
-                    color: #e5e7eb;
-                    border: 1px solid #4b5563;
-                    border-radius: 4px;
-                    padding: 2px 4px;
-                    font-size: 11px;
-                }
-            """)
-            for_start_input.setMaximumWidth(int(w - 16))
-
-            for_end_input = QLineEdit()
-            for_end_input.setPlaceholderText("end")
-            for_end_input.setStyleSheet("""
-                QLineEdit {
-                    background: #0f1115;
-                    color: #e5e7eb;
-                    border: 1px solid #4b5563;
-                    border-radius: 4px;
-                    padding: 2px 4px;
-                    font-size: 11px;
-                }
-            """)
-            for_end_input.setMaximumWidth(int(w - 16))
-
-            for_step_input = QLineEdit()
-            for_step_input.setPlaceholderText("step")
-            for_step_input.setStyleSheet("""
-                QLineEdit {
-                    background: #0f1115;
-                    color: #e5e7eb;
-                    border: 1px solid #4b5563;
-                    border-radius: 4px;
-                    padding: 2px 4px;
-                    font-size: 11px;
-                }
-            """)
-            for_step_input.setMaximumWidth(int(w - 16))
 
             widget_container = QWidget()
-            widget_container.setStyleSheet("background: transparent;")
+            widget_container.setObjectName("nodeContainer")
+            widget_container.setAttribute(Qt.WA_TranslucentBackground, True)
+            widget_container.setStyleSheet(self._node_style)
             vbox = QVBoxLayout(widget_container)
             vbox.setContentsMargins(0, 0, 0, 0)
             vbox.setSpacing(6)
@@ -971,64 +1181,15 @@ class GraphScene(QGraphicsScene):
             cond_row.addWidget(out_true_label)
             vbox.addLayout(cond_row)
 
-            else_row_widget = QWidget()
-            else_row_widget.setStyleSheet("background: transparent;")
-            else_row = QHBoxLayout(else_row_widget)
-            else_row.setContentsMargins(0, 0, 0, 0)
-            else_row.setSpacing(4)
-            else_label = _make_tag("Else")
-            else_row.addWidget(else_label)
-            else_row.addStretch(1)
-            else_row.addWidget(out_false_label)
+            else_row_widget = _make_row((_make_tag("Else"),), (out_false_label,))
             vbox.addWidget(else_row_widget)
 
-            loop_row_widget = QWidget()
-            loop_row_widget.setStyleSheet("background: transparent;")
-            loop_row = QHBoxLayout(loop_row_widget)
-            loop_row.setContentsMargins(0, 0, 0, 0)
-            loop_row.setSpacing(4)
-            loop_row.addWidget(loop_label)
-            loop_row.addWidget(loop_type_combo)
-            loop_row.addStretch(1)
-            loop_row.addWidget(loop_body_label)
-            vbox.addWidget(loop_row_widget)
-
-            loop_end_row_widget = QWidget()
-            loop_end_row_widget.setStyleSheet("background: transparent;")
-            loop_end_row = QHBoxLayout(loop_end_row_widget)
-            loop_end_row.setContentsMargins(0, 0, 0, 0)
-            loop_end_row.setSpacing(4)
-            loop_end_row.addStretch(1)
-            loop_end_row.addWidget(loop_end_label)
-            vbox.addWidget(loop_end_row_widget)
-
-            for_start_row_widget = QWidget()
-            for_start_row_widget.setStyleSheet("background: transparent;")
-            for_start_row = QHBoxLayout(for_start_row_widget)
-            for_start_row.setContentsMargins(0, 0, 0, 0)
-            for_start_row.setSpacing(4)
-            for_start_row.addWidget(for_start_input)
-            for_start_row.addStretch(1)
-            vbox.addWidget(for_start_row_widget)
-
-            for_end_row_widget = QWidget()
-            for_end_row_widget.setStyleSheet("background: transparent;")
-            for_end_row = QHBoxLayout(for_end_row_widget)
-            for_end_row.setContentsMargins(0, 0, 0, 0)
-            for_end_row.setSpacing(4)
-            for_end_row.addWidget(for_end_input)
-            for_end_row.addStretch(1)
-            vbox.addWidget(for_end_row_widget)
-
-            for_step_row_widget = QWidget()
-            for_step_row_widget.setStyleSheet("background: transparent;")
-            for_step_row = QHBoxLayout(for_step_row_widget)
-            for_step_row.setContentsMargins(0, 0, 0, 0)
-            for_step_row.setSpacing(4)
-            for_step_row.addWidget(for_step_input)
-            for_step_row.addStretch(1)
-            for_step_row.addWidget(for_end_label)
-            vbox.addWidget(for_step_row_widget)
+            # While/For rows are built on the first switch to loop mode (_build_loop_rows)
+            loop_type_combo = None
+            loop_label = loop_body_label = loop_end_label = for_end_label = None
+            for_start_input = for_end_input = for_step_input = None
+            loop_row_widget = loop_end_row_widget = None
+            for_start_row_widget = for_end_row_widget = for_step_row_widget = None
 
             # Ports
             data_port_x = 12
@@ -1046,14 +1207,15 @@ class GraphScene(QGraphicsScene):
             rect._elif_input_ports = []
             rect._elif_output_ports = []
             rect._elif_inputs = []
+            rect._elif_by_slot = {}  # "elif_N" input slot -> condition QLineEdit
             rect._elif_rows = []
             rect._elif_remove_btns = []
+            rect._elif_pool = []  # Removed elif rows kept for reuse
 
             def _remove_port_connections(port):
-                conns = port.data(2) or []
-                for conn in list(conns):
+                for conn in list(port._connections):
                     if conn and isValid(conn) and conn.scene() is not None:
-                        self.removeItem(conn)
+                        self._remove_connection(conn)
 
             def _reindex_elifs():
                 for i, inp in enumerate(rect._elif_inputs):
@@ -1062,64 +1224,28 @@ class GraphScene(QGraphicsScene):
                     port.setData(3, f"elif_{i}")
                 for i, port in enumerate(rect._elif_output_ports):
                     port.setData(3, f"out_elif_{i}")
+                    port._label = f"{name}.out_elif_{i}"
+                rect._elif_by_slot = {f"elif_{i}": inp for i, inp in enumerate(rect._elif_inputs)}
 
-            def _add_elif():
-                idx = len(rect._elif_output_ports)
-                inp = _mk_port(data_port_x, h * 0.60, "in", f"elif_{idx}", radius=4)
-                outp = _mk_port(w, h * 0.60, "out", f"out_elif_{idx}", radius=6)
-                rect._elif_input_ports.append(inp)
-                rect._elif_output_ports.append(outp)
-
+            def _make_elif_row():
                 elif_input = QLineEdit()
-                elif_input.setPlaceholderText(f"elif {idx}")
-                elif_input.setStyleSheet("""
-                    QLineEdit {
-                        background: #0f1115;
-                        color: #e5e7eb;
-                        border: 1px solid #4b5563;
-                        border-radius: 4px;
-                        padding: 2px 4px;
-                        font-size: 11px;
-                    }
-                """)
+                elif_input.setObjectName("nodeInput")
                 remove_btn = QPushButton("X")
                 remove_btn.setFixedWidth(20)
-                remove_btn.setStyleSheet("""
-                    QPushButton {
-                        background: #111827;
-                        color: #e5e7eb;
-                        border: 1px solid #4b5563;
-                        border-radius: 4px;
-                        padding: 0px;
-                        font-size: 10px;
-                    }
-                    QPushButton:hover {
-                        background: #1f2937;
-                    }
-                """)
-
-                row_widget = QWidget()
-                row_widget.setStyleSheet("background: transparent;")
-                row_layout = QHBoxLayout(row_widget)
-                row_layout.setContentsMargins(0, 0, 0, 0)
-                row_layout.setSpacing(4)
-                row_layout.addWidget(elif_input)
-                row_layout.addWidget(remove_btn)
-                row_layout.addStretch(1)
-                row_layout.addWidget(_make_tag("Elif"))
-
-                rect._elif_inputs.append(elif_input)
-                rect._elif_rows.append(row_widget)
-                rect._elif_remove_btns.append(remove_btn)
+                remove_btn.setObjectName("nodeRemoveButton")
+                row_widget = _make_row((elif_input, remove_btn), (_make_tag("Elif"),))
 
                 def _remove_this():
                     idx_local = rect._elif_rows.index(row_widget) if row_widget in rect._elif_rows else -1
                     if idx_local < 0:
                         return
-                    row_widget.setParent(None)
-                    row_widget.deleteLater()
+                    # Keep the row widgets for reuse by the next +elif
+                    vbox.removeWidget(row_widget)
+                    row_widget.setVisible(False)
+                    rect._elif_pool.append((row_widget, elif_input, remove_btn))
                     for port in (rect._elif_input_ports[idx_local], rect._elif_output_ports[idx_local]):
                         _remove_port_connections(port)
+                        rect._ports.remove(port)
                         if port.scene() is not None:
                             self.removeItem(port)
                     rect._elif_inputs.pop(idx_local)
@@ -1128,15 +1254,38 @@ class GraphScene(QGraphicsScene):
                     rect._elif_input_ports.pop(idx_local)
                     rect._elif_output_ports.pop(idx_local)
                     _reindex_elifs()
-                    QTimer.singleShot(0, _sync_layout)
+                    _schedule_layout()
                     self.regenerate_code()
 
                 remove_btn.clicked.connect(_remove_this)
-                elif_input.textChanged.connect(lambda _t: self._update_node_params(rect))
+                elif_input.textChanged.connect(self._on_param_changed)
+                return row_widget, elif_input, remove_btn
+
+            def _add_elif():
+                idx = len(rect._elif_output_ports)
+                inp = _mk_port(data_port_x, h * 0.60, "in", f"elif_{idx}", radius=4)
+                outp = _mk_port(w, h * 0.60, "out", f"out_elif_{idx}", radius=6)
+                rect._elif_input_ports.append(inp)
+                rect._elif_output_ports.append(outp)
+
+                if rect._elif_pool:
+                    row_widget, elif_input, remove_btn = rect._elif_pool.pop()
+                    elif_input.blockSignals(True)
+                    elif_input.clear()
+                    elif_input.blockSignals(False)
+                else:
+                    row_widget, elif_input, remove_btn = _make_elif_row()
+                elif_input.setPlaceholderText(f"elif {idx}")
+
+                rect._elif_inputs.append(elif_input)
+                rect._elif_by_slot[f"elif_{idx}"] = elif_input
+                rect._elif_rows.append(row_widget)
+                rect._elif_remove_btns.append(remove_btn)
 
                 insert_index = vbox.indexOf(else_row_widget)
                 vbox.insertWidget(insert_index, row_widget)
-                QTimer.singleShot(0, _sync_layout)
+                row_widget.setVisible(True)
+                _schedule_layout()
                 self.regenerate_code()
 
             add_elif_btn.clicked.connect(_add_elif)
@@ -1148,10 +1297,6 @@ class GraphScene(QGraphicsScene):
                 condition_label.setVisible(not enabled)
                 out_true_label.setVisible(enabled)
                 out_false_label.setVisible(enabled)
-                # no loop condition label in IF mode
-                loop_body_label.setVisible(not enabled)
-                loop_end_label.setVisible(False)
-                for_end_label.setVisible(False)
                 for row in rect._elif_rows:
                     row.setVisible(enabled)
                 for p in rect._elif_input_ports + rect._elif_output_ports:
@@ -1163,25 +1308,80 @@ class GraphScene(QGraphicsScene):
 
                 loop_body.setVisible(not enabled)
                 loop_end.setVisible(not enabled)
-                loop_row_widget.setVisible(not enabled)
-                loop_end_row_widget.setVisible(False)
-                for_start_row_widget.setVisible(False)
-                for_end_row_widget.setVisible(False)
-                for_step_row_widget.setVisible(False)
+                if loop_type_combo is not None:
+                    # no loop condition label in IF mode
+                    loop_body_label.setVisible(not enabled)
+                    loop_end_label.setVisible(False)
+                    for_end_label.setVisible(False)
+                    loop_row_widget.setVisible(not enabled)
+                    loop_end_row_widget.setVisible(False)
+                    for_start_row_widget.setVisible(False)
+                    for_end_row_widget.setVisible(False)
+                    for_step_row_widget.setVisible(False)
 
             def _set_for_ports_visible(enabled: bool):
-                for_start_input.setVisible(enabled)
-                for_end_input.setVisible(enabled)
-                for_step_input.setVisible(enabled)
                 for_start_port.setVisible(enabled)
                 for_end_port.setVisible(enabled)
                 for_step_port.setVisible(enabled)
-                for_start_row_widget.setVisible(enabled)
-                for_end_row_widget.setVisible(enabled)
-                for_step_row_widget.setVisible(enabled)
-                for_end_label.setVisible(enabled)
+                if loop_type_combo is not None:
+                    for_start_input.setVisible(enabled)
+                    for_end_input.setVisible(enabled)
+                    for_step_input.setVisible(enabled)
+                    for_start_row_widget.setVisible(enabled)
+                    for_end_row_widget.setVisible(enabled)
+                    for_step_row_widget.setVisible(enabled)
+                    for_end_label.setVisible(enabled)
+
+            def _build_loop_rows():
+                nonlocal loop_type_combo, loop_label, loop_body_label, loop_end_label, for_end_label
+                nonlocal for_start_input, for_end_input, for_step_input
+                nonlocal loop_row_widget, loop_end_row_widget
+                nonlocal for_start_row_widget, for_end_row_widget, for_step_row_widget
+                if loop_type_combo is not None:
+                    return
+
+                loop_type_combo = QComboBox()
+                loop_type_combo.addItems(["While", "For"])
+                loop_type_combo.setObjectName("nodeCombo")
+                loop_label = _make_tag("Loop")
+                loop_body_label = _make_tag("Body")
+                loop_end_label = _make_tag("End")
+                for_end_label = _make_tag("End")
+
+                # Appended after the else row, so elif rows inserted above it keep their place
+                loop_row_widget = _make_row((loop_label, loop_type_combo), (loop_body_label,))
+                vbox.addWidget(loop_row_widget)
+                loop_end_row_widget = _make_row(trailing=(loop_end_label,))
+                vbox.addWidget(loop_end_row_widget)
+
+                for_start_row_widget = PortInputRow("start")
+                for_end_row_widget = PortInputRow("end")
+                for_step_row_widget = PortInputRow("step", trailing=for_end_label)
+                for_start_input = for_start_row_widget.line_edit
+                for_end_input = for_end_row_widget.line_edit
+                for_step_input = for_step_row_widget.line_edit
+                for row_widget in (for_start_row_widget, for_end_row_widget, for_step_row_widget):
+                    row_widget.line_edit.setMaximumWidth(int(w - 16))
+                    vbox.addWidget(row_widget)
+
+                rect._loop_type_combo = loop_type_combo
+                rect._for_start_input = for_start_input
+                rect._for_end_input = for_end_input
+                rect._for_step_input = for_step_input
+
+                loop_type_combo.currentTextChanged.connect(lambda _t: _set_loop_mode())
+                loop_type_combo.currentTextChanged.connect(self._on_param_changed)
+                for_start_input.textChanged.connect(self._on_param_changed)
+                for_end_input.textChanged.connect(self._on_param_changed)
+                for_step_input.textChanged.connect(self._on_param_changed)
+
+                # Show labels for connections made before the inputs existed
+                for port in (for_start_port, for_end_port, for_step_port):
+                    for conn in port._connections:
+                        self._apply_connection_to_input(port, conn.out_port)
 
             def _set_loop_mode():
+                _build_loop_rows()
                 _set_if_mode(False)
                 loop_label.setVisible(True)
                 loop_type_combo.setVisible(True)
@@ -1194,17 +1394,18 @@ class GraphScene(QGraphicsScene):
                 _set_for_ports_visible(is_for)
                 loop_end_row_widget.setVisible(not is_for)
                 loop_end_label.setVisible(not is_for)
-                QTimer.singleShot(0, _sync_layout)
+                _schedule_layout()
                 self.regenerate_code()
 
             def _set_if_only():
-                loop_label.setVisible(False)
-                loop_type_combo.setVisible(False)
+                if loop_type_combo is not None:
+                    loop_label.setVisible(False)
+                    loop_type_combo.setVisible(False)
+                    loop_row_widget.setVisible(False)
+                    loop_end_row_widget.setVisible(False)
                 _set_for_ports_visible(False)
-                loop_row_widget.setVisible(False)
-                loop_end_row_widget.setVisible(False)
                 _set_if_mode(True)
-                QTimer.singleShot(0, _sync_layout)
+                _schedule_layout()
                 self.regenerate_code()
 
             def _on_mode_change():
@@ -1214,126 +1415,106 @@ class GraphScene(QGraphicsScene):
                     _set_if_only()
 
             combo.currentTextChanged.connect(_on_mode_change)
-            loop_type_combo.currentTextChanged.connect(lambda _t: _set_loop_mode())
 
             proxy = QGraphicsProxyWidget(rect)
             proxy.setWidget(widget_container)
             proxy.setPos(8, 38)
             proxy.setZValue(2)
 
-            def _port_y(widget):
-                if not widget:
-                    return None
-                if hasattr(widget, "center_y"):
-                    return widget.center_y(proxy)
-                geo = widget.geometry()
-                return proxy.pos().y() + geo.y() + geo.height() / 2
-
-            def _resize_to_fit(min_height: Optional[int] = None):
-                layout = widget_container.layout()
-                if layout:
-                    layout.activate()
-                widget_container.adjustSize()
-                size_hint = widget_container.sizeHint()
-                try:
-                    proxy.setMinimumSize(size_hint)
-                except Exception:
-                    pass
-                content_h = size_hint.height()
-                target_h = int(proxy.pos().y() + content_h + 10)
-                if min_height is not None:
-                    target_h = max(target_h, min_height)
-                rect_h = rect.rect().height()
-                if target_h != rect_h:
-                    rect.setRect(0, 0, rect.rect().width(), target_h)
-
             def _sync_ports():
                 if not isValid(rect):
                     return
                 w_now = rect.rect().width()
                 flow_in_port.setPos(0, rect.rect().height() / 2)
-                y = _port_y(condition_input if condition_input.isVisible() else condition_label)
+                # Snapshot the mode once; rows of the inactive mode are skipped
+                in_loop = loop_type_combo is not None and loop_row_widget.isVisible()
+                has_for = in_loop and for_step_row_widget.isVisible()
+                y = _proxy_row_y(proxy, condition_label if in_loop else condition_input)
                 if y is not None:
                     condition_port.setPos(data_port_x, y)
                     out_true.setPos(w_now, y)
-                y = _port_y(else_row_widget)
+                if in_loop:
+                    y = _proxy_row_y(proxy, loop_type_combo)
+                    if y is not None:
+                        loop_body.setPos(w_now, y)
+                    if has_for:
+                        y = _proxy_row_y(proxy, for_start_input)
+                        if y is not None:
+                            for_start_port.setPos(data_port_x, y)
+                        y = _proxy_row_y(proxy, for_end_input)
+                        if y is not None:
+                            for_end_port.setPos(data_port_x, y)
+                        y = _proxy_row_y(proxy, for_step_input)
+                        if y is not None:
+                            for_step_port.setPos(data_port_x, y)
+                    y = _proxy_row_y(proxy, for_step_row_widget if has_for else loop_end_row_widget)
+                    if y is not None:
+                        loop_end.setPos(w_now, y)
+                    return
+
+                y = _proxy_row_y(proxy, else_row_widget)
                 if y is not None:
                     out_false.setPos(w_now, y)
-                y = _port_y(for_start_input)
-                if y is not None:
-                    for_start_port.setPos(data_port_x, y)
-                y = _port_y(for_end_input)
-                if y is not None:
-                    for_end_port.setPos(data_port_x, y)
-                y = _port_y(for_step_input)
-                if y is not None:
-                    for_step_port.setPos(data_port_x, y)
-                y = _port_y(loop_type_combo)
-                if y is not None:
-                    loop_body.setPos(w_now, y)
-                y = _port_y(for_step_row_widget if for_step_row_widget.isVisible() else loop_end_row_widget if loop_end_row_widget.isVisible() else loop_row_widget if loop_row_widget.isVisible() else condition_input)
-                if y is not None:
-                    loop_end.setPos(w_now, y)
-
                 for idx, inp in enumerate(rect._elif_inputs):
                     if idx >= len(rect._elif_input_ports):
                         continue
-                    y = _port_y(inp)
+                    y = _proxy_row_y(proxy, inp)
                     if y is not None:
                         rect._elif_input_ports[idx].setPos(data_port_x, y)
                         rect._elif_output_ports[idx].setPos(w_now, y)
 
             def _sync_layout():
-                _resize_to_fit()
+                self._fit_node_to_proxy(rect, proxy)
                 _sync_ports()
+                self._mark_connections_dirty(rect)
 
-            QTimer.singleShot(0, _sync_layout)
+            # Mode switches and elif edits often queue several layouts per turn;
+            # the timer is owned by the container so it goes away with the node
+            layout_timer = QTimer(widget_container)
+            layout_timer.setSingleShot(True)
+            layout_timer.timeout.connect(_sync_layout)
+
+            def _schedule_layout():
+                if not layout_timer.isActive():
+                    layout_timer.start(0)
+
+            _schedule_layout()
 
             rect._condition_input = condition_input
             rect._condition_label = condition_label
-            rect._loop_type_combo = loop_type_combo
-            rect._for_start_input = for_start_input
-            rect._for_end_input = for_end_input
-            rect._for_step_input = for_step_input
 
             _on_mode_change()
-            condition_input.textChanged.connect(lambda _t: self._update_node_params(rect))
-            loop_type_combo.currentTextChanged.connect(lambda _t: self._update_node_params(rect))
-            for_start_input.textChanged.connect(lambda _t: self._update_node_params(rect))
-            for_end_input.textChanged.connect(lambda _t: self._update_node_params(rect))
-            for_step_input.textChanged.connect(lambda _t: self._update_node_params(rect))
-            combo.currentTextChanged.connect(lambda _t: self._update_node_params(rect))
+            condition_input.textChanged.connect(self._on_param_changed)
 
-        elif "Condition" in name or "条件判断" in name:
+        elif kind == NODE_KIND_CONDITION:
             features = features or ["Equal", "Not Equal", "Greater Than", "Less Than"]
             combo = QComboBox()
             combo.addItems(features)
             combo.setMinimumWidth(60)
             combo.setMaximumWidth(70)
-            combo.setStyleSheet(self._combo_style + self._combo_view_style)
+            combo.setObjectName("nodeCombo")
 
-            input_style = self._input_style
-
-            left_row = PortInputRow("left", input_style)
+            left_row = PortInputRow("left")
             left_input = left_row.line_edit
             left_input.setMaximumWidth(int(w - 16))
 
             def _make_tag(text: str) -> QLabel:
                 lbl = QLabel(text)
                 lbl.setObjectName("nodeTag")
-                lbl.setStyleSheet(self._tag_style)
                 return lbl
 
             out_label = _make_tag("Result")
 
             widget_container = QWidget()
-            widget_container.setStyleSheet("background: transparent;")
+            widget_container.setObjectName("nodeContainer")
+            widget_container.setAttribute(Qt.WA_TranslucentBackground, True)
+            widget_container.setStyleSheet(self._node_style)
             vbox = QVBoxLayout(widget_container)
             vbox.setContentsMargins(0, 0, 0, 0)
             vbox.setSpacing(4)
             vbox.addWidget(combo)
             vbox.addWidget(left_row)
-            right_row = PortInputRow("right", input_style, trailing=out_label)
+            right_row = PortInputRow("right", trailing=out_label)
             right_input = right_row.line_edit
             right_input.setMaximumWidth(int(w - 16))
             vbox.addWidget(right_row)
@@ -1348,72 +1529,49 @@ class GraphScene(QGraphicsScene):
             right_port = _mk_port(data_port_x, h * 0.70, "in", "right", radius=4)
             result_port = _mk_port(w - data_port_x, h / 2, "out", "result", radius=4)
 
-            def _port_y(widget):
-                if not widget:
-                    return None
-                geo = widget.geometry()
-                return proxy.pos().y() + geo.y() + geo.height() / 2
-
-            def _resize_to_fit(min_height: Optional[int] = None):
-                layout = widget_container.layout()
-                if layout:
-                    layout.activate()
-                widget_container.adjustSize()
-                size_hint = widget_container.sizeHint()
-                try:
-                    proxy.setMinimumSize(size_hint)
-                except Exception:
-                    pass
-                content_h = size_hint.height()
-                target_h = int(proxy.pos().y() + content_h + 10)
-                if min_height is not None:
-                    target_h = max(target_h, min_height)
-                rect_h = rect.rect().height()
-                if target_h != rect_h:
-                    rect.setRect(0, 0, rect.rect().width(), target_h)
-
             def _sync_ports():
                 if not isValid(rect):
                     return
                 w_now = rect.rect().width()
-                y = _port_y(left_row)
+                y = _proxy_row_y(proxy, left_row)
                 if y is not None:
                     left_port.setPos(data_port_x, y)
-                y = _port_y(right_row)
+                y = _proxy_row_y(proxy, right_row)
                 if y is not None:
                     right_port.setPos(data_port_x, y)
-                y = _port_y(right_row)
+                y = _proxy_row_y(proxy, right_row)
                 if y is not None:
                     result_port.setPos(w_now - data_port_x, y)
 
             def _sync_layout():
-                _resize_to_fit()
+                self._fit_node_to_proxy(rect, proxy)
                 _sync_ports()
+                self._mark_connections_dirty(rect)
 
             QTimer.singleShot(0, _sync_layout)
 
             rect._left_input = left_input
             rect._right_input = right_input
             rect._combo = combo
-            left_input.textChanged.connect(lambda _t: self._update_node_params(rect))
-            right_input.textChanged.connect(lambda _t: self._update_node_params(rect))
-            combo.currentTextChanged.connect(lambda _t: self._update_node_params(rect))
+            left_input.textChanged.connect(self._on_param_changed)
+            right_input.textChanged.connect(self._on_param_changed)
 
         elif "Timer" in name:
             def _make_tag(text: str) -> QLabel:
                 lbl = QLabel(text)
                 lbl.setObjectName("nodeTag")
-                lbl.setStyleSheet(self._tag_style)
                 return lbl
 
             unit_label = _make_tag("s")
-            duration_row = PortInputRow("duration (s)", self._input_style, trailing=unit_label)
+            duration_row = PortInputRow("duration (s)", trailing=unit_label)
             duration_input = duration_row.line_edit
             duration_input.setMaximumWidth(int(w - 16))
             duration_input.setValidator(QDoubleValidator(0.0, 60.0, 3, duration_input))
 
             widget_container = QWidget()
-            widget_container.setStyleSheet("background: transparent;")
+            widget_container.setObjectName("nodeContainer")
+            widget_container.setAttribute(Qt.WA_TranslucentBackground, True)
+            widget_container.setStyleSheet(self._node_style)
             vbox = QVBoxLayout(widget_container)
             vbox.setContentsMargins(0, 0, 0, 0)
             vbox.setSpacing(4)
@@ -1429,24 +1587,6 @@ class GraphScene(QGraphicsScene):
             flow_out_port = _mk_port(w, h / 2, "out", "flow_out", radius=6)
             duration_port = _mk_port(data_port_x, h * 0.65, "in", "duration", radius=4)
 
-            def _resize_to_fit(min_height: Optional[int] = None):
-                layout = widget_container.layout()
-                if layout:
-                    layout.activate()
-                widget_container.adjustSize()
-                size_hint = widget_container.sizeHint()
-                try:
-                    proxy.setMinimumSize(size_hint)
-                except Exception:
-                    pass
-                content_h = size_hint.height()
-                target_h = int(proxy.pos().y() + content_h + 10)
-                if min_height is not None:
-                    target_h = max(target_h, min_height)
-                rect_h = rect.rect().height()
-                if target_h != rect_h:
-                    rect.setRect(0, 0, rect.rect().width(), target_h)
-
             def _sync_ports():
                 if not isValid(rect):
                     return
@@ -1458,19 +1598,15 @@ class GraphScene(QGraphicsScene):
                 duration_port.setPos(data_port_x, y)
 
             def _sync_layout():
-                _resize_to_fit()
+                self._fit_node_to_proxy(rect, proxy)
                 _sync_ports()
+                self._mark_connections_dirty(rect)
 
             QTimer.singleShot(0, _sync_layout)
 
             rect._duration_input = duration_input
 
-            def _on_duration_change():
-                self._update_node_params(rect)
-                self._sync_node_parameters(rect)
-                self.regenerate_code()
-
-            duration_input.textChanged.connect(lambda _t: _on_duration_change())
+            duration_input.textChanged.connect(self._on_param_changed)
 
         else:
             # Other node types
@@ -1486,12 +1622,16 @@ class GraphScene(QGraphicsScene):
             combo.addItems(features)
             combo.setMinimumWidth(int(w * 0.85))
             combo.setMaximumWidth(int(w - 16))
-            combo.setStyleSheet(self._combo_style + self._combo_view_style)
+            combo.setObjectName("nodeCombo")
+
+            combo.setStyleSheet(self._node_style)
 
             _mk_port(0, h / 2, "in", "flow_in", radius=6)
             _mk_port(w, h / 2, "out", "flow_out", radius=6)
 
             proxy = QGraphicsProxyWidget(rect)
+            # Only a combo box, so the cached pixmap is not invalidated by typing
+            proxy.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
             proxy.setWidget(combo)
             proxy.setPos(8, 38)
             proxy.setZValue(2)
@@ -1502,6 +1642,7 @@ class GraphScene(QGraphicsScene):
         rect.setData(10, "node")
         rect.setData(11, name)
         rect.setData(12, node_id)
+        self._nodes_by_id[node_id] = rect
 
         # Create corresponding logic node instance
         logic_node = self._create_logic_node(name, node_id, rect)
@@ -1509,10 +1650,11 @@ class GraphScene(QGraphicsScene):
             self._logic_nodes[node_id] = logic_node
             rect.setData(13, logic_node)  # Store reference in graphics item
 
-        # Save combo reference
+        # Save combo reference; this is the only currentTextChanged -> regenerate hookup
         if combo:
             rect._combo = combo
-            combo.currentTextChanged.connect(lambda _t: self._on_combo_changed(rect))
+            combo.setProperty("node_id", node_id)
+            combo.currentTextChanged.connect(self._on_node_combo_changed)
 
         self.regenerate_code()
         log_info(f"Node created: {name} (ID: {node_id})")
@@ -1533,8 +1675,8 @@ class GraphScene(QGraphicsScene):
             return None
 
         # Handle Logic Control special case
-        if "Logic Control" in name:
-            combo = getattr(rect_item, '_combo', None)
+        if rect_item._kind == NODE_KIND_LOGIC:
+            combo = rect_item._combo
             if combo:
                 selection = combo.currentText().lower()
                 if selection.startswith("while") or selection.startswith("for"):
@@ -1550,14 +1692,33 @@ class GraphScene(QGraphicsScene):
             log_error(f"Failed to create logic node: {e}")
             return None
 
+    def _sender_node(self):
+        """Node item owning the editor that emitted the current signal"""
+        sender = self.sender()
+        if sender is None:
+            return None
+        return self._nodes_by_id.get(sender.property("node_id"))
+
+    @Slot(str)
+    def _on_param_changed(self, _text):
+        """Editor text changed - node params are collected by the debounced regeneration"""
+        self.regenerate_code()
+
+    @Slot(str)
+    def _on_node_combo_changed(self, _text):
+        """Node combo selection changed"""
+        node_item = self._sender_node()
+        if node_item is not None:
+            self._on_combo_changed(node_item)
+
     def _on_combo_changed(self, rect_item):
         """Handle combo box selection change"""
         node_id = rect_item.data(12)
         name = rect_item.data(11)
 
         # Update logic node if needed (especially for Logic Control)
-        if "Logic Control" in name:
-            combo = getattr(rect_item, '_combo', None)
+        if rect_item._kind == NODE_KIND_LOGIC:
+            combo = rect_item._combo
             if combo:
                 selection = combo.currentText().lower()
                 new_type = "while_loop" if (selection.startswith("while") or selection.startswith("for")) else "if"
@@ -1574,8 +1735,6 @@ class GraphScene(QGraphicsScene):
                     except Exception as e:
                         log_error(f"Failed to update logic node: {e}")
 
-        # Sync parameters
-        self._sync_node_parameters(rect_item)
         self.regenerate_code()
 
     def _sync_node_parameters(self, rect_item):
@@ -1586,13 +1745,13 @@ class GraphScene(QGraphicsScene):
             return
 
         name = rect_item.data(11)
-        combo = getattr(rect_item, '_combo', None)
+        combo = rect_item._combo
 
         # Sync based on node type
         if "Action Execution" in name and combo:
             action = combo.currentText()
             # Map UI action to robot action
-            robot_action = self._action_mapping.get(action, action.lower().replace(" ", "_"))
+            robot_action = ACTION_MAPPING.get(action, action.lower().replace(" ", "_"))
             logic_node.set_parameter('action', robot_action)
 
         elif "Sensor Input" in name and combo:
@@ -1606,19 +1765,19 @@ class GraphScene(QGraphicsScene):
             sensor_type = sensor_map.get(combo.currentText(), "imu")
             logic_node.set_parameter('sensor_type', sensor_type)
 
-        elif "Logic Control" in name:
-            cond_input = getattr(rect_item, '_condition_input', None)
+        elif rect_item._kind == NODE_KIND_LOGIC:
+            cond_input = rect_item._condition_input
             if cond_input:
                 logic_node.set_parameter('condition_expr', cond_input.text())
 
-            loop_type_combo = getattr(rect_item, '_loop_type_combo', None)
+            loop_type_combo = rect_item._loop_type_combo
             if loop_type_combo:
                 logic_node.set_parameter('loop_type', loop_type_combo.currentText().lower())
 
             # For loop parameters
-            for_start = getattr(rect_item, '_for_start_input', None)
-            for_end = getattr(rect_item, '_for_end_input', None)
-            for_step = getattr(rect_item, '_for_step_input', None)
+            for_start = rect_item._for_start_input
+            for_end = rect_item._for_end_input
+            for_step = rect_item._for_step_input
             if for_start:
                 try:
                     logic_node.set_parameter('for_start', int(for_start.text() or 0))
@@ -1636,12 +1795,12 @@ class GraphScene(QGraphicsScene):
                     logic_node.set_parameter('for_step', 1)
 
             # Elif conditions
-            elif_inputs = getattr(rect_item, '_elif_inputs', [])
+            elif_inputs = rect_item._elif_inputs or []
             logic_node.set_parameter('elif_conditions', [inp.text() for inp in elif_inputs])
 
-        elif "Condition" in name:
-            left_input = getattr(rect_item, '_left_input', None)
-            right_input = getattr(rect_item, '_right_input', None)
+        elif rect_item._kind == NODE_KIND_CONDITION:
+            left_input = rect_item._left_input
+            right_input = rect_item._right_input
             node_id = rect_item.data(12)
             if left_input:
                 logic_node.set_parameter('input_expr', left_input.text())
@@ -1678,8 +1837,8 @@ class GraphScene(QGraphicsScene):
             }
             logic_node.set_parameter('operation', op_map.get(combo.currentText(), "add"))
             # Get input values if available
-            left_input = getattr(rect_item, '_left_input', None)
-            right_input = getattr(rect_item, '_right_input', None)
+            left_input = rect_item._left_input
+            right_input = rect_item._right_input
             if left_input:
                 try:
                     logic_node.set_parameter('value_a', float(left_input.text() or 0))
@@ -1692,7 +1851,7 @@ class GraphScene(QGraphicsScene):
                     logic_node.set_parameter('value_b', 0)
 
         elif "Timer" in name:
-            duration_input = getattr(rect_item, "_duration_input", None)
+            duration_input = rect_item._duration_input
             duration_text = duration_input.text().strip() if duration_input else ""
             try:
                 duration_value = float(duration_text) if duration_text else 1.0
@@ -1703,35 +1862,59 @@ class GraphScene(QGraphicsScene):
 
     def _find_port_near(self, pos, radius=14):
         """Find port near position"""
-        search_rect = QRectF(pos.x() - radius, pos.y() - radius, radius * 2, radius * 2)
-        candidates = []
-
-        for it in self.items(search_rect):
-            if self._is_port(it):
-                c = self._port_center(it)
-                dist2 = (c.x() - pos.x()) ** 2 + (c.y() - pos.y()) ** 2
-                candidates.append((dist2, it))
-
-        return min(candidates, key=lambda t: t[0])[1] if candidates else None
+        # radius <= PORT_CELL, so the 3x3 cells around pos cover the search circle
+        cx, cy = self._port_cell(pos)
+        px, py = pos.x(), pos.y()
+        best, best_d2 = None, radius * radius
+
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for port in self._port_grid.get((gx, gy), ()):
+                    if not port.isVisible():
+                        continue
+                    c = port.scene_center()
+                    dx, dy = c.x() - px, c.y() - py
+                    d2 = dx * dx + dy * dy
+                    if d2 <= best_d2:
+                        best, best_d2 = port, d2
+
+        return best
+
+    def _port_cell(self, pos) -> tuple:
+        """Port grid cell containing a scene position"""
+        return (math.floor(pos.x() / self.PORT_CELL), math.floor(pos.y() / self.PORT_CELL))
+
+    def _index_port(self, port):
+        """Move a port to the grid cell of its current scene position"""
+        cell = self._port_cell(port.scene_center())
+        if cell == port._grid_cell:
+            return
+        self._unindex_port(port)
+        self._port_grid.setdefault(cell, []).append(port)
+        port._grid_cell = cell
+
+    def _unindex_port(self, port):
+        """Drop a port from the grid"""
+        bucket = self._port_grid.get(port._grid_cell)
+        if bucket is not None:
+            if port in bucket:
+                bucket.remove(port)
+            if not bucket:
+                del self._port_grid[port._grid_cell]
+        port._grid_cell = None
 
     def _is_port(self, item):
-        """Check if item is a port"""
-        return bool(item) and item.data(0) == "port"
+        """Check if item is a port (a type check; no QVariant round-trip through data())"""
+        return isinstance(item, PortItem)
 
     def _port_center(self, port_item):
         """Get port center position"""
-        return port_item.mapToScene(port_item.boundingRect().center())
+        return port_item.scene_center()
 
     def _attach_connection_safe(self, port_item, conn_item):
         """Safely attach connection to port"""
         try:
-            conns = port_item.data(2) or []
-            cleaned = []
-            for c in conns:
-                if c and isValid(c) and (c.scene() is not None):
-                    cleaned.append(c)
-            cleaned.append(conn_item)
-            port_item.setData(2, cleaned)
+            port_item._connections.add(conn_item)
         except Exception:
             pass
 
@@ -1746,51 +1929,23 @@ class GraphScene(QGraphicsScene):
         in_slot = in_port.data(3)
         label = self._format_connection_label(out_port)
 
-        if in_slot == "condition":
-            inp = getattr(node_item, "_condition_input", None)
+        field_name = _INPUT_SLOT_FIELDS.get(in_slot)
+        if field_name is not None:
+            field = getattr(node_item, field_name)
+            if field:
+                self._set_text_silently(field, label)
+        elif in_slot == "condition":
+            inp = node_item._condition_input
             if inp and inp.isVisible():
-                inp.setText(label)
+                self._set_text_silently(inp, label)
             else:
-                lbl = getattr(node_item, "_condition_label", None)
+                lbl = node_item._condition_label
                 if lbl:
                     lbl.setText(label)
-        elif isinstance(in_slot, str) and in_slot.startswith("elif_"):
-            idx = int(in_slot.split("_")[1])
-            elif_inputs = getattr(node_item, "_elif_inputs", [])
-            if idx < len(elif_inputs):
-                elif_inputs[idx].setText(label)
-        elif in_slot in ("for_start", "for_end", "for_step"):
-            field = getattr(node_item, f"_for_{in_slot.split('_')[1]}_input", None)
-            if field:
-                field.setText(label)
-        elif in_slot == "duration":
-            duration_input = getattr(node_item, "_duration_input", None)
-            if duration_input:
-                duration_input.setText(label)
-        elif in_slot in ("left", "right"):
-            left_input = getattr(node_item, "_left_input", None)
-            right_input = getattr(node_item, "_right_input", None)
-            if left_input or right_input:
-                if in_slot == "left" and left_input:
-                    left_input.setText(label)
-                if in_slot == "right" and right_input:
-                    right_input.setText(label)
-            else:
-                input_box = getattr(node_item, "_input_box", None)
-                if input_box:
-                    cmp_inputs = getattr(node_item, "_cmp_inputs", {"left": "", "right": ""})
-                    cmp_inputs[in_slot] = label
-                    node_item._cmp_inputs = cmp_inputs
-                    left = cmp_inputs.get("left", "")
-                    right = cmp_inputs.get("right", "")
-                    parts = []
-                    if left:
-                        parts.append(f"left={left}")
-                    if right:
-                        parts.append(f"right={right}")
-                    input_box.setText(", ".join(parts))
-
-        self._update_node_params(node_item)
+        elif node_item._elif_by_slot and in_slot in node_item._elif_by_slot:
+            self._set_text_silently(node_item._elif_by_slot[in_slot], label)
+
+        self.regenerate_code()
 
     def _clear_input_for_port(self, in_port):
         """Clear input widgets when a connection is removed"""
@@ -1801,62 +1956,43 @@ class GraphScene(QGraphicsScene):
             return
         in_slot = in_port.data(3)
 
-        if in_slot == "condition":
-            inp = getattr(node_item, "_condition_input", None)
+        field_name = _INPUT_SLOT_FIELDS.get(in_slot)
+        if field_name is not None:
+            field = getattr(node_item, field_name)
+            if field:
+                self._set_text_silently(field, "")
+        elif in_slot == "condition":
+            inp = node_item._condition_input
             if inp and inp.isVisible():
-                inp.setText("")
+                self._set_text_silently(inp, "")
             else:
-                lbl = getattr(node_item, "_condition_label", None)
+                lbl = node_item._condition_label
                 if lbl:
                     lbl.setText("Condition")
-        elif isinstance(in_slot, str) and in_slot.startswith("elif_"):
-            idx = int(in_slot.split("_")[1])
-            elif_inputs = getattr(node_item, "_elif_inputs", [])
-            if idx < len(elif_inputs):
-                elif_inputs[idx].setText("")
-        elif in_slot in ("for_start", "for_end", "for_step"):
-            field = getattr(node_item, f"_for_{in_slot.split('_')[1]}_input", None)
-            if field:
-                field.setText("")
-        elif in_slot == "duration":
-            duration_input = getattr(node_item, "_duration_input", None)
-            if duration_input:
-                duration_input.setText("")
-        elif in_slot in ("left", "right"):
-            left_input = getattr(node_item, "_left_input", None)
-            right_input = getattr(node_item, "_right_input", None)
-            if left_input or right_input:
-                if in_slot == "left" and left_input:
-                    left_input.setText("")
-                if in_slot == "right" and right_input:
-                    right_input.setText("")
-            else:
-                input_box = getattr(node_item, "_input_box", None)
-                if input_box:
-                    cmp_inputs = getattr(node_item, "_cmp_inputs", {"left": "", "right": ""})
-                    cmp_inputs[in_slot] = ""
-                    node_item._cmp_inputs = cmp_inputs
-                    left = cmp_inputs.get("left", "")
-                    right = cmp_inputs.get("right", "")
-                    parts = []
-                    if left:
-                        parts.append(f"left={left}")
-                    if right:
-                        parts.append(f"right={right}")
-                    input_box.setText(", ".join(parts))
-
-        self._update_node_params(node_item)
+        elif node_item._elif_by_slot and in_slot in node_item._elif_by_slot:
+            self._set_text_silently(node_item._elif_by_slot[in_slot], "")
+
+        self.regenerate_code()
+
+    @staticmethod
+    def _set_text_silently(widget, text: str):
+        """Set editor text without emitting textChanged; callers sync params once"""
+        blocker = QSignalBlocker(widget)
+        widget.setText(text)
+        blocker.unblock()
 
     def _format_connection_label(self, out_port):
         """Format a readable label for a connected output"""
         if not out_port:
             return ""
-        node_item = out_port.parentItem()
-        if node_item and node_item.data(10) == "node":
-            name = node_item.data(11)
-            slot = out_port.data(3)
-            return f"{name}.{slot}"
-        return str(out_port.data(3))
+        # Built by create_node when the port is made or its elif slot renumbered
+        return out_port._label or str(out_port.data(3))
+
+    def _update_all_node_params(self):
+        """Collect UI values of every node into its metadata and logic node"""
+        for item in self._nodes_by_id.values():
+            self._update_node_params(item)
+            self._sync_node_parameters(item)
 
     def _update_node_params(self, node_item):
         """Collect UI values into node metadata for later execution"""
@@ -1865,24 +2001,24 @@ class GraphScene(QGraphicsScene):
 
         params = node_item.data(20) or {}
 
-        if hasattr(node_item, "_condition_input"):
+        if node_item._condition_input is not None:
             params["condition_expr"] = node_item._condition_input.text()
-        if hasattr(node_item, "_elif_inputs"):
+        if node_item._elif_inputs is not None:
             params["elif_conditions"] = [w.text() for w in node_item._elif_inputs]
-        if hasattr(node_item, "_loop_type_combo"):
+        if node_item._loop_type_combo is not None:
             params["loop_type"] = node_item._loop_type_combo.currentText().lower()
-        if hasattr(node_item, "_for_start_input"):
+        if node_item._for_start_input is not None:
             params["for_start"] = node_item._for_start_input.text()
-        if hasattr(node_item, "_for_end_input"):
+        if node_item._for_end_input is not None:
             params["for_end"] = node_item._for_end_input.text()
-        if hasattr(node_item, "_for_step_input"):
+        if node_item._for_step_input is not None:
             params["for_step"] = node_item._for_step_input.text()
-        if hasattr(node_item, "_combo"):
+        if node_item._combo is not None:
             params["ui_selection"] = node_item._combo.currentText()
 
-        if hasattr(node_item, "_left_input") or hasattr(node_item, "_right_input"):
-            left_input = getattr(node_item, "_left_input", None)
-            right_input = getattr(node_item, "_right_input", None)
+        if node_item._left_input is not None or node_item._right_input is not None:
+            left_input = node_item._left_input
+            right_input = node_item._right_input
             left = left_input.text() if left_input else ""
             right = right_input.text() if right_input else ""
             parts = []
@@ -1891,11 +2027,9 @@ class GraphScene(QGraphicsScene):
             if right:
                 parts.append(f"right={right}")
             params["input_expr"] = ", ".join(parts)
-        elif hasattr(node_item, "_input_box"):
-            params["input_expr"] = node_item._input_box.text()
-        if hasattr(node_item, "_output_box"):
+        if node_item._output_box is not None:
             params["output_name"] = node_item._output_box.text()
-        if hasattr(node_item, "_duration_input"):
+        if node_item._duration_input is not None:
             params["duration"] = node_item._duration_input.text()
 
         node_item.setData(20, params)
@@ -1911,23 +2045,21 @@ class GraphScene(QGraphicsScene):
         # Collect all connections and connected nodes
         connections = []
         connected_node_ids = set()
-        node_map = {}  # id -> node item
-
-        for item in self.items():
-            if isinstance(item, ConnectionItem):
-                if item.out_port and item.in_port and isValid(item.out_port) and isValid(item.in_port):
-                    out_node = item.out_port.parentItem()
-                    in_node = item.in_port.parentItem()
-                    if out_node and in_node and out_node.data(10) == "node" and in_node.data(10) == "node":
-                        out_id = out_node.data(12)
-                        in_id = in_node.data(12)
-                        connections.append((out_id, in_id))
-                        connected_node_ids.add(out_id)
-                        connected_node_ids.add(in_id)
-                        node_map[out_id] = out_node
-                        node_map[in_id] = in_node
-            elif item.data(10) == "node":
-                node_map[item.data(12)] = item
+        node_map = dict(self._nodes_by_id)  # id -> node item
+
+        # Newest connection first, the order tie-breaks have always used
+        for item in reversed(self._connections):
+            if item.out_port and item.in_port and isValid(item.out_port) and isValid(item.in_port):
+                out_node = item.out_port.parentItem()
+                in_node = item.in_port.parentItem()
+                if out_node and in_node and out_node.data(10) == "node" and in_node.data(10) == "node":
+                    out_id = out_node.data(12)
+                    in_id = in_node.data(12)
+                    connections.append((out_id, in_id))
+                    connected_node_ids.add(out_id)
+                    connected_node_ids.add(in_id)
+                    node_map[out_id] = out_node
+                    node_map[in_id] = in_node
 
         # If no connections, return empty (no connected workflow)
         if not connected_node_ids:
@@ -1972,35 +2104,33 @@ class GraphScene(QGraphicsScene):
             'incoming': {},     # node_id -> {port_name -> [(source_node_id, source_port)]}
         }
 
-        # Collect all nodes
-        for item in self.items():
-            if item.data(10) == "node":
-                node_id = item.data(12)
-                graph['nodes'][node_id] = item
-                graph['outgoing'][node_id] = {}
-                graph['incoming'][node_id] = {}
-
-        # Collect all connections
-        for item in self.items():
-            if isinstance(item, ConnectionItem):
-                if item.out_port and item.in_port and isValid(item.out_port) and isValid(item.in_port):
-                    out_node = item.out_port.parentItem()
-                    in_node = item.in_port.parentItem()
-                    if out_node and in_node and out_node.data(10) == "node" and in_node.data(10) == "node":
-                        out_id = out_node.data(12)
-                        in_id = in_node.data(12)
-                        out_port = item.out_port.data(3)
-                        in_port = item.in_port.data(3)
-
-                        # Add to outgoing
-                        if out_port not in graph['outgoing'][out_id]:
-                            graph['outgoing'][out_id][out_port] = []
-                        graph['outgoing'][out_id][out_port].append((in_id, in_port))
-
-                        # Add to incoming
-                        if in_port not in graph['incoming'][in_id]:
-                            graph['incoming'][in_id][in_port] = []
-                        graph['incoming'][in_id][in_port].append((out_id, out_port))
+        # Collect all nodes, newest first (the scene's stacking order, which
+        # decides tie-breaks in the generated code)
+        for node_id, item in reversed(self._nodes_by_id.items()):
+            graph['nodes'][node_id] = item
+            graph['outgoing'][node_id] = {}
+            graph['incoming'][node_id] = {}
+
+        # Collect all connections, newest first like the nodes
+        for item in reversed(self._connections):
+            if item.out_port and item.in_port and isValid(item.out_port) and isValid(item.in_port):
+                out_node = item.out_port.parentItem()
+                in_node = item.in_port.parentItem()
+                if out_node and in_node and out_node.data(10) == "node" and in_node.data(10) == "node":
+                    out_id = out_node.data(12)
+                    in_id = in_node.data(12)
+                    out_port = item.out_port.data(3)
+                    in_port = item.in_port.data(3)
+
+                    # Add to outgoing
+                    if out_port not in graph['outgoing'][out_id]:
+                        graph['outgoing'][out_id][out_port] = []
+                    graph['outgoing'][out_id][out_port].append((in_id, in_port))
+
+                    # Add to incoming
+                    if in_port not in graph['incoming'][in_id]:
+                        graph['incoming'][in_id][in_port] = []
+                    graph['incoming'][in_id][in_port].append((out_id, out_port))
 
         return graph
 
@@ -2027,9 +2157,8 @@ class GraphScene(QGraphicsScene):
             source_id, source_port = condition_sources[0]
             source_item = graph['nodes'].get(source_id)
             if source_item:
-                source_name = source_item.data(11)
                 # If connected to a Condition node, use its output variable
-                if "Condition" in source_name:
+                if source_item._kind == NODE_KIND_CONDITION:
                     logic_node = self._logic_nodes.get(source_id)
                     if logic_node:
                         output_name = logic_node.get_parameter('output_name', '') or 'result'
@@ -2038,7 +2167,7 @@ class GraphScene(QGraphicsScene):
         # Fallback to condition input text
         item = graph['nodes'].get(node_id)
         if item:
-            cond_input = getattr(item, '_condition_input', None)
+            cond_input = item._condition_input
             if cond_input and cond_input.text():
                 return cond_input.text()
 
@@ -2063,8 +2192,8 @@ class GraphScene(QGraphicsScene):
         outgoing = graph['outgoing'].get(node_id, {})
 
         # Handle Logic Control nodes (if/while/for)
-        if "Logic Control" in node_name:
-            combo = getattr(item, '_combo', None)
+        if item._kind == NODE_KIND_LOGIC:
+            combo = item._combo
             selection = combo.currentText().lower() if combo else "if"
 
             if selection.startswith("if"):
@@ -2081,8 +2210,8 @@ class GraphScene(QGraphicsScene):
                     code_lines.append(f"{indent_str}    pass")
 
                 # Generate elif branches
-                elif_inputs = getattr(item, '_elif_inputs', [])
-                elif_output_ports = getattr(item, '_elif_output_ports', [])
+                elif_inputs = item._elif_inputs or []
+                elif_output_ports = item._elif_output_ports or []
                 for idx, elif_input in enumerate(elif_inputs):
                     elif_cond = elif_input.text() or f"elif_condition_{idx}"
                     code_lines.append(f"{indent_str}elif {elif_cond}:")
@@ -2105,13 +2234,13 @@ class GraphScene(QGraphicsScene):
 
             else:
                 # While or For loop
-                loop_type_combo = getattr(item, '_loop_type_combo', None)
+                loop_type_combo = item._loop_type_combo
                 loop_type = loop_type_combo.currentText().lower() if loop_type_combo else "while"
 
                 if loop_type == "for":
-                    fs = getattr(item, '_for_start_input', None)
-                    fe = getattr(item, '_for_end_input', None)
-                    fp = getattr(item, '_for_step_input', None)
+                    fs = item._for_start_input
+                    fe = item._for_end_input
+                    fp = item._for_step_input
                     start = fs.text() if fs and fs.text() else "0"
                     end = fe.text() if fe and fe.text() else "10"
                     step = fp.text() if fp and fp.text() else "1"
@@ -2134,13 +2263,10 @@ class GraphScene(QGraphicsScene):
                     code_lines.extend(self._generate_node_code(target_id, graph, indent, generated))
 
         # Handle Condition nodes
-        elif "Condition" in node_name:
+        elif item._kind == NODE_KIND_CONDITION:
             if logic_node:
-                # Sync parameters
-                self._sync_node_parameters(item)
                 node_code = logic_node.to_code()
-                for line in node_code.strip().split('\n'):
-                    code_lines.append(f"{indent_str}{line}")
+                code_lines.extend(f"{indent_str}{line}" for line in node_code.strip().split('\n'))
 
             # Continue with result output (data flow, not control flow)
             # Don't follow result connections as they are data, not flow
@@ -2148,16 +2274,14 @@ class GraphScene(QGraphicsScene):
         # Handle Action/Sensor nodes
         else:
             if logic_node:
-                self._sync_node_parameters(item)
                 node_code = logic_node.to_code()
-                for line in node_code.strip().split('\n'):
-                    code_lines.append(f"{indent_str}{line}")
+                code_lines.extend(f"{indent_str}{line}" for line in node_code.strip().split('\n'))
             else:
                 # Fallback
-                combo = getattr(item, '_combo', None)
+                combo = item._combo
                 if combo and "Action Execution" in node_name:
                     action = combo.currentText()
-                    robot_action = self._action_mapping.get(action, action.lower().replace(" ", "_"))
+                    robot_action = ACTION_MAPPING.get(action, action.lower().replace(" ", "_"))
                     code_lines.append(f"{indent_str}# Action: {action}")
                     code_lines.append(f"{indent_str}robot.run_action('{robot_action}')")
                 elif combo and "Sensor Input" in node_name:
@@ -2172,41 +2296,42 @@ class GraphScene(QGraphicsScene):
         return code_lines
 
     def regenerate_code(self):
+        """Schedule code regeneration (restarts the 50 ms debounce timer)
+
+        While the code editor is hidden or collapsed the rebuild is only marked
+        pending; it runs when the editor is shown again or on flush_code().
+        """
+        if self._code_editor is not None and not self._code_editor.is_on_screen():
+            self._regen_timer.stop()
+            self._regen_pending = True
+            return
+        self._regen_timer.start(50)
+
+    def flush_code(self):
+        """Run a pending code regeneration immediately"""
+        if self._regen_pending or self._regen_timer.isActive():
+            self._regen_timer.stop()
+            self._do_regenerate_code()
+
+    def _do_regenerate_code(self):
         """Regenerate code with proper control flow nesting"""
+        self._regen_pending = False
         if not self._code_editor:
             return
 
-        # Sync all node parameters before generating code
-        for item in self.items():
-            if item.data(10) == "node":
-                self._sync_node_parameters(item)
-
-        code_lines = [
-            "#!/usr/bin/env python3",
-            "# -*- coding: utf-8 -*-",
-            '"""',
-            "Auto-generated workflow code",
-            "Generated by UnitPort - Celebrimbor",
-            '"""',
-            "",
-        ]
+        # Sync all node parameters once; _generate_node_code relies on this
+        self._update_all_node_params()
+
+        code_lines = list(_CODE_HEADER)
 
         # Build connection graph
         graph = self._build_connection_graph()
 
+        code_lines.extend(_CODE_FUNC_HEADER)
         if not graph['nodes']:
-            code_lines.extend([
-                "def execute_workflow(robot=None):",
-                "    '''Execute the visual workflow'''",
-                "    pass  # No nodes in workflow",
-                "",
-            ])
+            code_lines.extend(("    pass  # No nodes in workflow", ""))
         else:
-            code_lines.extend([
-                "def execute_workflow(robot=None):",
-                "    '''Execute the visual workflow'''",
-                "",
-            ])
+            code_lines.append("")
 
             # Find entry points and generate code
             entry_nodes = self._find_entry_nodes(graph)
@@ -2214,8 +2339,7 @@ class GraphScene(QGraphicsScene):
 
             # First generate Condition nodes that provide data (not in control flow)
             for node_id, item in graph['nodes'].items():
-                node_name = item.data(11)
-                if "Condition" in node_name:
+                if item._kind == NODE_KIND_CONDITION:
                     # Check if this feeds into a Logic Control node
                     outgoing = graph['outgoing'].get(node_id, {})
                     result_targets = outgoing.get('result', [])
@@ -2238,21 +2362,18 @@ class GraphScene(QGraphicsScene):
             if len(code_lines) <= 8:  # Only header
                 code_lines.append("    pass  # No connected workflow")
 
-        code_lines.extend([
-            "",
-            "if __name__ == '__main__':",
-            "    # Initialize robot (simulation or real)",
-            "    # from models import get_robot_model",
-            "    # robot = get_robot_model('go2')",
-            "    robot = None  # Replace with actual robot instance",
-            "    execute_workflow(robot)",
-        ])
+        code_lines.extend(_CODE_FOOTER)
 
-        # Use set_code method
-        self._code_editor.set_code("\n".join(code_lines))
+        # Skip the editor reset (and its repaint) when nothing changed; compare
+        # against the editor text so manual edits are still overwritten
+        code = "\n".join(code_lines)
+        if code == self._code_editor.get_code():
+            return
+        self._code_editor.set_code(code)
 
     def get_workflow_data(self) -> Dict[str, Any]:
         """Get workflow data for execution"""
+        self._update_all_node_params()
         ordered_nodes = self._build_workflow_order()
         workflow = {
             'nodes': [],
@@ -2274,25 +2395,24 @@ class GraphScene(QGraphicsScene):
             }
 
             # Add UI-specific parameters
-            combo = getattr(item, '_combo', None)
+            combo = item._combo
             if combo:
                 node_data['ui_selection'] = combo.currentText()
 
             workflow['nodes'].append(node_data)
             workflow['execution_order'].append(node_id)
 
-        # Collect connections
-        for item in self.items():
-            if isinstance(item, ConnectionItem):
-                if item.out_port and item.in_port and isValid(item.out_port) and isValid(item.in_port):
-                    out_node = item.out_port.parentItem()
-                    in_node = item.in_port.parentItem()
-                    if out_node and in_node:
-                        workflow['connections'].append({
-                            'from_node': out_node.data(12),
-                            'from_port': item.out_port.data(3),
-                            'to_node': in_node.data(12),
-                            'to_port': item.in_port.data(3)
-                        })
+        # Collect connections, newest first
+        for item in reversed(self._connections):
+            if item.out_port and item.in_port and isValid(item.out_port) and isValid(item.in_port):
+                out_node = item.out_port.parentItem()
+                in_node = item.in_port.parentItem()
+                if out_node and in_node:
+                    workflow['connections'].append({
+                        'from_node': out_node.data(12),
+                        'from_port': item.out_port.data(3),
+                        'to_node': in_node.data(12),
+                        'to_port': item.in_port.data(3)
+                    })
 
         return workflow
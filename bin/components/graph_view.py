@@ -25,9 +25,10 @@ class GraphView(QGraphicsView):
         self.setRenderHint(QPainter.TextAntialiasing, True)
         self.setRenderHint(QPainter.SmoothPixmapTransform, True)
         
-        # 优化性能
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # 优化性能: 只重绘脏区域, 网格背景缓存为视口像素图(平移时滚动复用)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
         self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, True)
+        self.setCacheMode(QGraphicsView.CacheBackground)
         
         # 拖拽模式 - 默认使用RubberBandDrag
         self.setDragMode(QGraphicsView.RubberBandDrag)
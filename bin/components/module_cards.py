@@ -29,6 +29,51 @@ from nodes.sys_nodes import (
 from custom_nodes import get_custom_nodes
 
 
+# Item data role holding the pre-encoded drag payload (bytes)
+_PAYLOAD_BYTES_ROLE = Qt.UserRole + 1
+
+_ACTION_FEATURES = ["Lift Right Leg", "Stand", "Sit", "Walk", "Stop"]
+_LOGIC_FEATURES = ["If", "While Loop"]
+
+# Static system node catalog: (group tr key, group fallback, ((label, payload), ...))
+_SYSTEM_NODE_GROUPS = (
+    ("modules.action_nodes", "Action Nodes", (
+        ("ActionExecutionNode", {"title": "Action Execution", "features": _ACTION_FEATURES, "preset": "Stand"}),
+        ("StopNode", {"title": "Action Execution", "features": _ACTION_FEATURES, "preset": "Stop"}),
+    )),
+    ("modules.logic_nodes", "Logic Nodes", (
+        ("IfNode", {"title": "Logic Control", "features": _LOGIC_FEATURES, "preset": "If"}),
+        ("WhileLoopNode", {"title": "Logic Control", "features": _LOGIC_FEATURES, "preset": "While Loop"}),
+        ("ComparisonNode", {
+            "title": "Condition",
+            "features": ["Equal", "Not Equal", "Greater Than", "Less Than", "Greater Equal", "Less Equal"],
+            "preset": "Equal"
+        }),
+    )),
+    ("modules.sensor_nodes", "Sensor Nodes", (
+        ("SensorInputNode", {
+            "title": "Sensor Input",
+            "features": ["Read Ultrasonic", "Read Infrared", "Read Camera", "Read IMU", "Read Odometry"],
+            "preset": "Read IMU"
+        }),
+    )),
+    ("modules.utility_nodes", "Utility Nodes", (
+        ("MathNode", {
+            "title": "Math",
+            "features": ["Add", "Subtract", "Multiply", "Divide", "Power", "Modulo", "Min", "Max", "Abs", "Sum", "Average"],
+            "preset": "Add"
+        }),
+        ("TimerNode", {"title": "Timer", "features": []}),
+    )),
+)
+
+
+def _set_style_sheet(widget: QWidget, style_sheet: str):
+    """Apply a stylesheet only if it changed; Qt re-parses and re-polishes on every set"""
+    if widget.styleSheet() != style_sheet:
+        widget.setStyleSheet(style_sheet)
+
+
 class NodeTree(QTreeWidget):
     """Draggable node tree"""
 
@@ -49,7 +94,8 @@ class NodeTree(QTreeWidget):
         selected_bg = get_color("card_bg", "#1f2937")
         font_size = get_font_size("size_small", 12)
 
-        self.setStyleSheet(
+        _set_style_sheet(
+            self,
             f"""
             QTreeWidget {{
                 background: transparent;
@@ -81,7 +127,7 @@ class NodeTree(QTreeWidget):
 
         drag = QDrag(self)
         mime = QMimeData()
-        mime.setData("application/x-module-card", json.dumps(payload).encode("utf-8"))
+        mime.setData("application/x-module-card", item.data(0, _PAYLOAD_BYTES_ROLE))
         mime.setText(f"Node: {payload.get('title', '')}")
         drag.setMimeData(mime)
         drag.exec(Qt.CopyAction)
@@ -148,7 +194,8 @@ class ModulePalette(QWidget):
         title_size = get_font_size("size_large", 16)
         subtitle_size = get_font_size("size_small", 12)
 
-        self.panel.setStyleSheet(
+        _set_style_sheet(
+            self.panel,
             f"""
             #panel {{
                 background: {panel_bg};
@@ -167,7 +214,8 @@ class ModulePalette(QWidget):
             """
         )
 
-        self.status_label.setStyleSheet(
+        _set_style_sheet(
+            self.status_label,
             f"""
             QLabel {{
                 color: {status_text};
@@ -205,62 +253,11 @@ class ModulePalette(QWidget):
         self.tree.addTopLevelItem(system_root)
         self.tree.addTopLevelItem(custom_root)
 
-        action_group = QTreeWidgetItem([tr("modules.action_nodes", "Action Nodes")])
-        logic_group = QTreeWidgetItem([tr("modules.logic_nodes", "Logic Nodes")])
-        sensor_group = QTreeWidgetItem([tr("modules.sensor_nodes", "Sensor Nodes")])
-        utility_group = QTreeWidgetItem([tr("modules.utility_nodes", "Utility Nodes")])
-
-        system_root.addChild(action_group)
-        system_root.addChild(logic_group)
-        system_root.addChild(sensor_group)
-        system_root.addChild(utility_group)
-
-        # Action nodes
-        self._add_node_item(action_group, "ActionExecutionNode", {
-            "title": "Action Execution",
-            "features": ["Lift Right Leg", "Stand", "Sit", "Walk", "Stop"],
-            "preset": "Stand"
-        })
-        self._add_node_item(action_group, "StopNode", {
-            "title": "Action Execution",
-            "features": ["Lift Right Leg", "Stand", "Sit", "Walk", "Stop"],
-            "preset": "Stop"
-        })
-
-        # Logic nodes
-        self._add_node_item(logic_group, "IfNode", {
-            "title": "Logic Control",
-            "features": ["If", "While Loop"],
-            "preset": "If"
-        })
-        self._add_node_item(logic_group, "WhileLoopNode", {
-            "title": "Logic Control",
-            "features": ["If", "While Loop"],
-            "preset": "While Loop"
-        })
-        self._add_node_item(logic_group, "ComparisonNode", {
-            "title": "Condition",
-            "features": ["Equal", "Not Equal", "Greater Than", "Less Than", "Greater Equal", "Less Equal"],
-            "preset": "Equal"
-        })
-
-        # Sensor nodes
-        self._add_node_item(sensor_group, "SensorInputNode", {
-            "title": "Sensor Input",
-            "features": ["Read Ultrasonic", "Read Infrared", "Read Camera", "Read IMU", "Read Odometry"],
-            "preset": "Read IMU"
-        })
-
-        # Utility nodes
-        self._add_node_item(utility_group, "MathNode", {
-            "title": "Math",
-            "features": ["Add", "Subtract", "Multiply", "Divide", "Power", "Modulo", "Min", "Max", "Abs", "Sum", "Average"],
-            "preset": "Add"
-        })
-        self._add_node_item(utility_group, "TimerNode", {
-            "title": "Timer",
-            "features": []
-        })
+        for group_key, group_fallback, entries in _SYSTEM_NODE_GROUPS:
+            group = QTreeWidgetItem([tr(group_key, group_fallback)])
+            system_root.addChild(group)
+            for label, payload in entries:
+                self._add_node_item(group, label, payload)
 
         custom_nodes = get_custom_nodes()
         if not custom_nodes:
@@ -279,8 +276,10 @@ class ModulePalette(QWidget):
     def _add_node_item(self, parent: QTreeWidgetItem, label: str, payload: Optional[Dict[str, Any]] = None):
         item = QTreeWidgetItem([label])
         item.setFlags(item.flags() | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-        data = payload or {}
+        data = dict(payload) if payload else {}
         if "draggable" not in data:
             data["draggable"] = True
         item.setData(0, Qt.UserRole, data)
+        # Encode once here so startDrag only copies the bytes
+        item.setData(0, _PAYLOAD_BYTES_ROLE, json.dumps(data).encode("utf-8"))
         parent.addChild(item)
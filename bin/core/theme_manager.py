@@ -10,6 +10,8 @@ from pathlib import Path
 from typing import Optional
 from PySide6.QtGui import QFont, QColor
 
+from bin.core.data_manager import get_data_manager
+
 
 # Global config path - set by main.py via init_theme_manager()
 _ui_config_path: Optional[str] = None
@@ -24,18 +26,30 @@ def init_theme_manager(config_path: str):
     """
     global _ui_config_path
     _ui_config_path = config_path
+    reload()
+
+
+def reload():
+    """
+    Re-read ui.ini once and make every slot pick it up on next use
+    """
+    config_path = _get_default_config_path()
+
+    # Parse the file once; existing slots re-read it from the cache on next use
+    try:
+        _read_ui_config(config_path, force_reload=True)
+    except Exception:
+        # Silent fallback - slots use their defaults if the file stays unreadable
+        pass
+    for slot in (_color_slot, _node_color_slot, _font_slot):
+        if slot is not None:
+            slot._config_path = config_path
+            slot._loaded = False
+
 
-    # Reinitialize slots if they exist
-    global _color_slot, _node_color_slot, _font_slot
-    if _color_slot is not None:
-        _color_slot._config_path = config_path
-        _color_slot.reload()
-    if _node_color_slot is not None:
-        _node_color_slot._config_path = config_path
-        _node_color_slot.reload()
-    if _font_slot is not None:
-        _font_slot._config_path = config_path
-        _font_slot.reload()
+def _read_ui_config(config_path: str, force_reload: bool = False) -> configparser.ConfigParser:
+    """Get parsed ui.ini, shared by all slots through the DataManager INI cache"""
+    return get_data_manager().load_ini(config_path, force_reload=force_reload)
 
 
 def _get_default_config_path() -> str:
@@ -78,8 +92,7 @@ class ColorSlot:
     def _load_colors(self):
         """Load colors from config file"""
         try:
-            config = configparser.ConfigParser()
-            config.read(self._config_path, encoding='utf-8')
+            config = _read_ui_config(self._config_path)
 
             self._colors.clear()
 
@@ -123,11 +136,6 @@ class ColorSlot:
         color = self.get_qcolor(color_key, fallback)
         return (color.red(), color.green(), color.blue())
 
-    def reload(self):
-        """Reload config"""
-        self._loaded = False
-        self._load_colors()
-
 
 class NodeColorSlot:
     """
@@ -160,8 +168,7 @@ class NodeColorSlot:
     def _load_colors(self):
         """Load node colors from config file"""
         try:
-            config = configparser.ConfigParser()
-            config.read(self._config_path, encoding='utf-8')
+            config = _read_ui_config(self._config_path)
 
             self._colors.clear()
             if 'NodeColors' in config:
@@ -186,11 +193,6 @@ class NodeColorSlot:
             self.get_color(end_key, fallback_end)
         )
 
-    def reload(self):
-        """Reload config"""
-        self._loaded = False
-        self._load_colors()
-
 
 class FontSlot:
     """
@@ -224,8 +226,7 @@ class FontSlot:
     def _load_fonts(self):
         """Load fonts from config file"""
         try:
-            config = configparser.ConfigParser()
-            config.read(self._config_path, encoding='utf-8')
+            config = _read_ui_config(self._config_path)
 
             if 'Font' not in config:
                 self._family = "Arial"
@@ -268,11 +269,6 @@ class FontSlot:
         self._ensure_loaded()
         return self._family
 
-    def reload(self):
-        """Reload config"""
-        self._loaded = False
-        self._load_fonts()
-
 
 # ============================================================================
 # Global instances and convenience functions
@@ -13,7 +13,7 @@ from PySide6.QtWidgets import (
 )
 
 from bin.components.code_editor import CodeEditor
-from bin.components.graph_scene import GraphScene
+from bin.components.graph_scene import GraphScene, ACTION_MAPPING
 from bin.components.graph_view import GraphView
 from bin.components.module_cards import ModulePalette
 from bin.core.simulation_thread import SimulationThread
@@ -144,7 +144,7 @@ class MainWindow(QMainWindow):
             text_secondary = '#cccccc'
             hover_bg = '#3d3d3d'
 
-        self.setStyleSheet(f"""
+        style_sheet = f"""
             QMainWindow {{
                 background-color: {bg};
             }}
@@ -198,7 +198,11 @@ class MainWindow(QMainWindow):
             QSplitter::handle:vertical {{
                 height: 2px;
             }}
-        """)
+        """
+        # The window sheet cascades to every child widget, so re-setting an
+        # unchanged one (e.g. on a language switch) would re-polish them all
+        if style_sheet != self.styleSheet():
+            self.setStyleSheet(style_sheet)
 
     def _init_toolbar(self):
         """Initialize toolbar"""
@@ -356,6 +360,7 @@ class MainWindow(QMainWindow):
     def _on_export_code(self):
         """Export code"""
         log_info(tr("log.export_code", "Export code"))
+        self.graph_scene.flush_code()
         code = self.code_editor.get_code()
         QMessageBox.information(
             self,
@@ -483,7 +488,7 @@ class MainWindow(QMainWindow):
                 ui_selection = node_data.get('ui_selection', '')
                 if "Action Execution" in node_name and self.robot_model:
                     has_action = True
-                    action = self.graph_scene._action_mapping.get(
+                    action = ACTION_MAPPING.get(
                         ui_selection,
                         ui_selection.lower().replace(" ", "_")
                     )
@@ -540,20 +545,26 @@ class MainWindow(QMainWindow):
             "lift_right_leg"
         )
 
-        # Connect signals
-        self.simulation_thread.simulation_started.connect(
-            lambda msg: self.status.showMessage(msg)
-        )
-        self.simulation_thread.simulation_finished.connect(
-            lambda msg: self.status.showMessage(msg, 3000)
-        )
-        self.simulation_thread.error_occurred.connect(
-            lambda msg: QMessageBox.critical(self, "Error", msg)
-        )
+        # Connect signals (bound methods, so the slots run in the GUI thread)
+        self.simulation_thread.simulation_started.connect(self._on_simulation_started)
+        self.simulation_thread.simulation_finished.connect(self._on_simulation_finished)
+        self.simulation_thread.error_occurred.connect(self._on_simulation_error)
 
         # Start thread
         self.simulation_thread.start()
 
+    def _on_simulation_started(self, msg: str):
+        """Simulation thread started"""
+        self.status.showMessage(msg)
+
+    def _on_simulation_finished(self, msg: str):
+        """Simulation thread finished"""
+        self.status.showMessage(msg, 3000)
+
+    def _on_simulation_error(self, msg: str):
+        """Simulation thread failed"""
+        QMessageBox.critical(self, "Error", msg)
+
     def _on_node_requested(self, payload: dict):
         """Create node from node library double-click"""
         if not payload:
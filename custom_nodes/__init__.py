@@ -15,8 +15,10 @@ HOW TO ADD CUSTOM NODES:
 3. Define your custom node class:
 
    class MyCustomNode(BaseNode):
+       node_type = "my_custom"
+
        def __init__(self, node_id: str):
-           super().__init__(node_id, "my_custom")
+           super().__init__(node_id)
            self.inputs = {'in': None}
            self.outputs = {'out': None}
            self.parameters = {'my_param': 'default'}
@@ -34,6 +36,11 @@ HOW TO ADD CUSTOM NODES:
        def to_code(self):
            return "# Generated code\\n"
 
+   Auto-discovery also finds it. Listing the module's nodes
+   (recommended) saves scanning every name in the module:
+
+   __custom_nodes__ = (MyCustomNode,)
+
 4. Register your node in this __init__.py file:
 
    from .my_nodes import MyCustomNode
@@ -71,39 +78,51 @@ CUSTOM_NODES: Dict[str, Type[BaseNode]] = {}
 # AUTO-DISCOVERY (Optional - for advanced users)
 # ============================================================================
 
-def discover_custom_nodes():
+def discover_custom_nodes(package: str = "custom_nodes", package_dir=None):
     """
     Auto-discover custom node files in this directory.
     Called by the node registry during initialization.
+
+    Args:
+        package: Package the node modules are imported from
+        package_dir: Directory of that package, defaults to this directory
     """
     import os
+    import inspect
     import importlib
     from pathlib import Path
 
-    custom_dir = Path(__file__).parent
+    custom_dir = Path(package_dir) if package_dir is not None else Path(__file__).parent
 
-    for file in custom_dir.glob("*.py"):
-        if file.name.startswith("_"):
-            continue
+    with os.scandir(custom_dir) as entries:
+        module_names = [
+            entry.name[:-3] for entry in entries
+            if entry.name.endswith(".py") and not entry.name.startswith("_")
+            and entry.is_file()
+        ]
 
-        module_name = file.stem
+    for module_name in module_names:
         try:
-            module = importlib.import_module(f".{module_name}", package="custom_nodes")
+            module = importlib.import_module(f".{module_name}", package=package)
 
-            # Look for classes that inherit from BaseNode
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
+            # Modules may list their nodes; otherwise look for classes that inherit from BaseNode
+            classes = getattr(module, "__custom_nodes__", None)
+            if classes is None:
+                classes = [getattr(module, attr_name) for attr_name in dir(module)]
+            for attr in classes:
                 if (isinstance(attr, type) and
                     issubclass(attr, BaseNode) and
-                    attr is not BaseNode):
-                    # Register using the node_type from an instance
-                    try:
-                        temp_instance = attr("temp")
-                        node_type = temp_instance.node_type
-                        if node_type not in CUSTOM_NODES:
-                            CUSTOM_NODES[node_type] = attr
-                    except:
-                        pass
+                    not inspect.isabstract(attr)):
+                    # Only a type the class declares itself counts; a subclass of
+                    # another node may set its own type in __init__ instead
+                    node_type = vars(attr).get("node_type")
+                    if not node_type:
+                        # Older nodes only pass node_type to __init__
+                        try:
+                            node_type = attr("temp").node_type
+                        except Exception:
+                            continue
+                    CUSTOM_NODES.setdefault(node_type, attr)
         except Exception:
             pass
 
@@ -32,6 +32,14 @@ from custom_nodes import CUSTOM_NODES, discover_custom_nodes, get_custom_nodes
 
 REGISTERED_NODES: Dict[str, Type[BaseNode]] = {}
 
+# Built-in node types (registered below, before any custom nodes)
+_SYSTEM_TYPES = frozenset({
+    'action_execution', 'stop',
+    'if', 'while_loop', 'comparison',
+    'sensor_input',
+    'math', 'timer', 'variable'
+})
+
 
 def register_node(node_type: str, node_class: Type[BaseNode]):
     """
@@ -71,9 +79,10 @@ def create_node(node_type: str, node_id: str) -> BaseNode:
     Raises:
         ValueError: If node type not found
     """
-    node_class = get_node_class(node_type)
-    if node_class is None:
-        raise ValueError(f"Node type not found: {node_type}")
+    try:
+        node_class = REGISTERED_NODES[node_type]
+    except KeyError:
+        raise ValueError(f"Node type not found: {node_type}") from None
 
     return node_class(node_id)
 
@@ -90,19 +99,12 @@ def list_node_types() -> List[str]:
 
 def list_system_nodes() -> List[str]:
     """List only system (built-in) node types"""
-    system_types = [
-        'action_execution', 'stop',
-        'if', 'while_loop', 'comparison',
-        'sensor_input',
-        'math', 'timer', 'variable'
-    ]
-    return [t for t in system_types if t in REGISTERED_NODES]
+    return [t for t in REGISTERED_NODES if t in _SYSTEM_TYPES]
 
 
 def list_custom_nodes() -> List[str]:
     """List only custom node types"""
-    system_types = set(list_system_nodes())
-    return [t for t in REGISTERED_NODES.keys() if t not in system_types]
+    return [t for t in REGISTERED_NODES if t not in _SYSTEM_TYPES]
 
 
 # ============================================================================
@@ -25,8 +25,10 @@ class ActionExecutionNode(BaseNode):
     to the appropriate brand-specific model (e.g., models/unitree/unitree_model.py).
     """
 
+    node_type = "action_execution"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "action_execution")
+        super().__init__(node_id)
         self.inputs = {'flow_in': None}
         self.outputs = {'flow_out': None}
         self.parameters = {
@@ -90,8 +92,10 @@ class ActionExecutionNode(BaseNode):
 class StopNode(BaseNode):
     """Stop node - stops robot motion."""
 
+    node_type = "stop"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "stop")
+        super().__init__(node_id)
         self.inputs = {'flow_in': None}
         self.outputs = {'flow_out': None}
         self.parameters = {
@@ -6,22 +6,27 @@ All draggable functional nodes should inherit from this base class
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 
 class BaseNode(ABC):
     """Node base class"""
 
-    def __init__(self, node_id: str, node_type: str):
+    # Registry key; subclasses declare it so discovery can read it without an instance
+    node_type: str = ""
+
+    def __init__(self, node_id: str, node_type: Optional[str] = None):
         """
         Initialize node
 
         Args:
             node_id: Unique node ID
-            node_type: Node type
+            node_type: Deprecated, declare node_type as a class attribute instead;
+                still honored for older custom nodes that pass it here
         """
         self.node_id = node_id
-        self.node_type = node_type
+        if node_type is not None and node_type != self.node_type:
+            self.node_type = node_type
         self.inputs = {}
         self.outputs = {}
         self.parameters = {}
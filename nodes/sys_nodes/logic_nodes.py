@@ -4,15 +4,28 @@
 Logic Control Nodes
 """
 
+import operator
 from typing import Dict, Any, List
 from .base_node import BaseNode
 
+# ComparisonNode operators; unknown operators fall back to ==
+_COMPARE_OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le
+}
+
 
 class IfNode(BaseNode):
     """Conditional branch node"""
 
+    node_type = "if"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "if")
+        super().__init__(node_id)
         self.inputs = {'condition': None}
         self.outputs = {'out_true': None, 'out_false': None}
         self.parameters = {
@@ -50,10 +63,11 @@ class IfNode(BaseNode):
 
     def to_code(self) -> str:
         condition_expr = self.get_parameter('condition_expr', '') or 'condition'
-        elif_blocks = ""
+        elif_parts = []
         for idx, expr in enumerate(self.parameters.get('elif_conditions', [])):
             cond_expr = expr or f"elif_condition_{idx}"
-            elif_blocks += f"elif {cond_expr}:\n    # elif branch {idx}\n    pass\n"
+            elif_parts.append(f"elif {cond_expr}:\n    # elif branch {idx}\n    pass\n")
+        elif_blocks = "".join(elif_parts)
         return (
             f"# Conditional branch\n"
             f"if {condition_expr}:\n"
@@ -69,8 +83,10 @@ class IfNode(BaseNode):
 class WhileLoopNode(BaseNode):
     """While loop node"""
 
+    node_type = "while_loop"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "while_loop")
+        super().__init__(node_id)
         self.inputs = {
             'condition': None,
             'for_start': None,
@@ -120,8 +136,10 @@ class WhileLoopNode(BaseNode):
 class ComparisonNode(BaseNode):
     """Comparison node"""
 
+    node_type = "comparison"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "comparison")
+        super().__init__(node_id)
         self.inputs = {'left': None, 'right': None, 'value_in': None, 'compare_value': None}
         self.outputs = {'result': None}
         self.parameters = {
@@ -133,20 +151,17 @@ class ComparisonNode(BaseNode):
 
     def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Execute comparison"""
-        value = inputs.get('left', inputs.get('value_in', 0))
-        operator = self.get_parameter('operator', '==')
-        compare_value = inputs.get('right', inputs.get('compare_value', self.get_parameter('compare_value', 0)))
-
-        operators = {
-            '==': lambda a, b: a == b,
-            '!=': lambda a, b: a != b,
-            '>': lambda a, b: a > b,
-            '<': lambda a, b: a < b,
-            '>=': lambda a, b: a >= b,
-            '<=': lambda a, b: a <= b
-        }
+        # Fallbacks are only looked up when the preferred input is missing
+        value = inputs['left'] if 'left' in inputs else inputs.get('value_in', 0)
+        operator_str = self.get_parameter('operator', '==')
+        if 'right' in inputs:
+            compare_value = inputs['right']
+        elif 'compare_value' in inputs:
+            compare_value = inputs['compare_value']
+        else:
+            compare_value = self.get_parameter('compare_value', 0)
 
-        result = operators.get(operator, operators['=='])(value, compare_value)
+        result = _COMPARE_OPS.get(operator_str, operator.eq)(value, compare_value)
 
         return {'result': {'value': result}}
 
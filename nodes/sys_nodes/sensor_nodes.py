@@ -25,8 +25,10 @@ class SensorInputNode(BaseNode):
     to the appropriate brand-specific model.
     """
 
+    node_type = "sensor_input"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "sensor_input")
+        super().__init__(node_id)
         self.inputs = {}
         self.outputs = {'out': None}
         self.parameters = {
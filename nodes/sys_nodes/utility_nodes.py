@@ -32,8 +32,10 @@ class MathNode(BaseNode):
         'max': lambda a, b: max(a, b),
     }
 
+    node_type = "math"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "math")
+        super().__init__(node_id)
         self.inputs = {
             'a': None,      # First operand
             'b': None,      # Second operand
@@ -138,8 +140,10 @@ class TimerNode(BaseNode):
     Similar to time.sleep() but can be interrupted and reports progress.
     """
 
+    node_type = "timer"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "timer")
+        super().__init__(node_id)
         self.inputs = {'flow_in': None, 'duration': None}
         self.outputs = {'flow_out': None}
         self.parameters = {
@@ -225,8 +229,10 @@ class VariableNode(BaseNode):
     Useful for storing intermediate results or constants.
     """
 
+    node_type = "variable"
+
     def __init__(self, node_id: str):
-        super().__init__(node_id, "variable")
+        super().__init__(node_id)
         self.inputs = {'set_value': None}
         self.outputs = {'value': None}
         self.parameters = {
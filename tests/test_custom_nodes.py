@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自定义节点发现测试
+"""
+
+import sys
+import textwrap
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# custom_nodes 需经由节点注册表导入，与应用启动顺序一致
+import nodes  # noqa: F401
+import custom_nodes
+from custom_nodes import discover_custom_nodes
+
+NODE_CLASS = """
+from nodes.sys_nodes.base_node import BaseNode
+
+
+class {name}(BaseNode):
+    node_type = "{node_type}"
+
+    def execute(self, inputs):
+        return {{}}
+
+    def get_display_name(self):
+        return "{name}"
+
+    def get_description(self):
+        return ""
+"""
+
+
+def _discover(tmp_path, monkeypatch, modules):
+    """把模块写入临时插件包并执行发现，返回注册结果"""
+    package = f"tmp_plugins_{tmp_path.name}"
+    package_dir = tmp_path / package
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    for name, source in modules.items():
+        (package_dir / f"{name}.py").write_text(textwrap.dedent(source))
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(custom_nodes, "CUSTOM_NODES", {})
+    discover_custom_nodes(package, package_dir)
+    return custom_nodes.CUSTOM_NODES
+
+
+def test_subclass_of_system_node_keeps_instance_type(tmp_path, monkeypatch):
+    """测试继承系统节点并在 __init__ 中设置类型的自定义节点仍按自身类型注册"""
+    found = _discover(tmp_path, monkeypatch, {"my_action": """
+        from nodes.sys_nodes import ActionExecutionNode
+
+        class MyAction(ActionExecutionNode):
+            def __init__(self, node_id):
+                super().__init__(node_id)
+                self.node_type = "my_action"
+    """})
+
+    assert found["my_action"].__name__ == "MyAction"
+
+
+def test_class_level_node_type(tmp_path, monkeypatch):
+    """测试类属性声明的节点类型无需实例化即可注册"""
+    source = NODE_CLASS.format(name="DeclaredNode", node_type="declared") + """
+
+def _no_init(self, node_id):
+    raise RuntimeError("discovery must not instantiate")
+
+
+DeclaredNode.__init__ = _no_init
+"""
+    found = _discover(tmp_path, monkeypatch, {"declared": source})
+
+    assert found["declared"].__name__ == "DeclaredNode"
+
+
+def test_manifest_and_module_scanning(tmp_path, monkeypatch):
+    """测试 __custom_nodes__ 清单、模块扫描、抽象基类、私有模块与导入失败的处理"""
+    found = _discover(tmp_path, monkeypatch, {
+        # 只注册清单中列出的节点
+        "listed": (NODE_CLASS.format(name="ListedNode", node_type="listed")
+                   + NODE_CLASS.format(name="UnlistedNode", node_type="unlisted")
+                   + "\n__custom_nodes__ = (ListedNode,)\n"),
+        # 没有清单时扫描全部 BaseNode 子类
+        "scanned": NODE_CLASS.format(name="ScannedNode", node_type="scanned"),
+        # 未实现全部抽象方法的基类不注册
+        "abstract": """
+            from nodes.sys_nodes.base_node import BaseNode
+
+            class SharedBase(BaseNode):
+                node_type = "shared_base"
+        """,
+        # 以下划线开头的模块不导入
+        "_private": NODE_CLASS.format(name="PrivateNode", node_type="private"),
+        # 导入失败的模块被跳过，不影响其余模块
+        "broken": 'raise ImportError("missing dependency")\n',
+    })
+
+    assert set(found) == {"listed", "scanned"}
+    assert not any(name.endswith("._private") for name in sys.modules)
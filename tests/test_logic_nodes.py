@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逻辑节点测试
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from nodes import create_node
+
+
+# (运算符, left, right, 期望结果)
+OPERATOR_CASES = [
+    ('==', 2, 2, True),
+    ('==', 2, 3, False),
+    ('==', 'a', 'a', True),
+    ('==', 1, 1.0, True),
+    ('!=', 2, 3, True),
+    ('!=', 'a', 'a', False),
+    ('>', 3, 2, True),
+    ('>', 2, 2, False),
+    ('>', 'b', 'a', True),
+    ('<', 1.5, 2, True),
+    ('<', 2, 1.5, False),
+    ('>=', 2, 2, True),
+    ('>=', 1, 2, False),
+    ('<=', 2, 2.0, True),
+    ('<=', 'b', 'a', False),
+    ('~=', 2, 2, True),           # 未知运算符按 == 处理
+    ('~=', 2, 3, False),
+    ('==', '1', 1, False),        # 不同类型的相等比较
+    ('!=', None, 0, True),
+]
+
+
+@pytest.mark.parametrize('operator, left, right, expected', OPERATOR_CASES)
+def test_comparison_operators(operator, left, right, expected):
+    """测试各运算符的比较结果"""
+    node = create_node('comparison', 'cmp')
+    node.set_parameter('operator', operator)
+
+    assert node.execute({'left': left, 'right': right}) == {'result': {'value': expected}}
+
+
+@pytest.mark.parametrize('operator', ['>', '<', '>=', '<='])
+def test_comparison_unorderable_operands(operator):
+    """测试无法排序的操作数抛出 TypeError"""
+    node = create_node('comparison', 'cmp')
+    node.set_parameter('operator', operator)
+
+    with pytest.raises(TypeError):
+        node.execute({'left': '1', 'right': 1})
+
+
+# (输入, compare_value 参数为 3 时 == 的结果)
+FALLBACK_CASES = [
+    ({}, False),                                   # 0 == 3
+    ({'left': 3}, True),                           # 3 == 3
+    ({'value_in': 3}, True),                       # left 缺失时使用 value_in
+    ({'left': 3, 'value_in': 9}, True),            # left 优先于 value_in
+    ({'right': 0}, True),                          # 0 == 0
+    ({'compare_value': 0}, True),                  # right 缺失时使用 compare_value 输入
+    ({'right': 0, 'compare_value': 9}, True),      # right 优先于 compare_value 输入
+    ({'left': None, 'value_in': 3}, False),        # None 是有效输入，不回退
+    ({'left': None, 'right': None}, True),         # None == None
+    ({'value_in': None, 'compare_value': None}, True),
+]
+
+
+@pytest.mark.parametrize('inputs, expected', FALLBACK_CASES)
+def test_comparison_input_fallbacks(inputs, expected):
+    """测试输入缺失或为 None 时的回退值"""
+    node = create_node('comparison', 'cmp')
+    node.set_parameter('compare_value', 3)
+
+    assert node.execute(inputs) == {'result': {'value': expected}}
+
+
+def test_comparison_defaults():
+    """测试无输入且参数缺失时按 0 == 0 比较，已连接 right 时忽略参数"""
+    node = create_node('comparison', 'cmp')
+    del node.parameters['compare_value']
+    del node.parameters['operator']
+    assert node.execute({}) == {'result': {'value': True}}
+
+    node.set_parameter('operator', '>')
+    node.set_parameter('compare_value', 100)
+    assert node.execute({'left': 5, 'right': 4}) == {'result': {'value': True}}
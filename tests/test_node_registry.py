@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+节点注册表测试
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import nodes
+import custom_nodes
+from nodes import IfNode, list_system_nodes, list_custom_nodes, load_custom_nodes
+from nodes.sys_nodes.base_node import BaseNode
+
+SYSTEM_TYPES = [
+    'action_execution', 'stop',
+    'if', 'while_loop', 'comparison',
+    'sensor_input',
+    'math', 'timer', 'variable'
+]
+
+
+class _CustomNode(BaseNode):
+    node_type = "if"
+
+    def execute(self, inputs):
+        return {}
+
+    def get_display_name(self):
+        return "Custom If"
+
+    def get_description(self):
+        return ""
+
+
+def test_system_nodes_in_registration_order():
+    """测试系统节点按注册顺序列出"""
+    assert list_system_nodes() == SYSTEM_TYPES
+
+
+def test_custom_nodes_kept_apart_from_system_nodes(monkeypatch):
+    """测试自定义节点不会覆盖同名系统节点，也不会混入系统节点列表"""
+    monkeypatch.setattr(nodes, "REGISTERED_NODES", dict(nodes.REGISTERED_NODES))
+    monkeypatch.setattr(nodes, "discover_custom_nodes", lambda: None)
+    monkeypatch.setattr(custom_nodes, "CUSTOM_NODES", {"extra": _CustomNode, "if": _CustomNode})
+    load_custom_nodes()
+
+    assert nodes.REGISTERED_NODES["if"] is IfNode
+    assert list_system_nodes() == SYSTEM_TYPES
+    assert list_custom_nodes() == ["extra"]